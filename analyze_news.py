@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
+from scoring import score_stories, rank
+from static_output import publish_json
 
 # Story data with proper excerpts
 stories = []
@@ -203,50 +204,25 @@ stories.append(story15)
 
 # Calculate viral scores
 def calculate_viral_score(story):
-    # Outlet count score (0-40 points)
-    outlet_count = len(story['outlets'])
-    outlet_score = min(40, outlet_count * 8)
-    
-    # Prominence score (0-30 points)
-    prominence_map = {
-        'top_story': 30,
-        'featured': 20,
-        'main': 10,
-        'news_feed': 5
-    }
-    prominence_score = prominence_map.get(story['prominence'], 5)
-    
-    # Recency score (0-30 points)
-    recency_hours = story['recency_hours']
-    if recency_hours <= 2:
-        recency_score = 30
-    elif recency_hours <= 6:
-        recency_score = 25
-    elif recency_hours <= 12:
-        recency_score = 20
-    elif recency_hours <= 24:
-        recency_score = 15
-    else:
-        recency_score = 10
-    
-    total_score = outlet_score + prominence_score + recency_score
-    return total_score
+    # Outlet count (0-40), prominence (0-30) and recency (0-30) points:
+    # the 'curated' profile in scoring.json
+    return int(score_stories([story], 'curated')[0])
 
 # Calculate scores and rank
-for story in stories:
-    story['viral_score'] = calculate_viral_score(story)
+scores = score_stories(stories, 'curated')
+for story, score in zip(stories, scores.tolist()):
+    story['viral_score'] = score
     story['outlet_count'] = len(story['outlets'])
 
 # Sort by viral score
-stories.sort(key=lambda x: x['viral_score'], reverse=True)
+stories = [stories[i] for i in rank(scores)]
 
 # Assign ranks
 for i, story in enumerate(stories, 1):
     story['rank'] = i
 
 # Save analysis results
-with open('temp_analysis_results.json', 'w', encoding='utf-8') as f:
-    json.dump(stories, f, ensure_ascii=False, indent=2)
+publish_json('temp_analysis_results.json', stories)
 
 print("Analysis complete. Top 15 stories ranked by viral score:")
 for story in stories[:15]:
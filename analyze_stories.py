@@ -1,226 +1,364 @@
 #!/usr/bin/env python3
+import argparse
 import json
 from datetime import datetime
 import os
 from openai import OpenAI
+from llm_cache import cached_completion, LLM_CACHE
+from enrichment import EnrichmentExecutor
+from translation_memory import TRANSLATION_MEMORY
+from outlets import load_registry
+from seen_index import SeenIndex
+from history import HistoryStore
+from static_output import publish_json, write_site
+from stories_file import read_stories
+from scoring import get_profile, score_columns, score_stories, rank
+from timestamps import MSK, age_hours
+from taxonomy import classify
 
-# Initialize OpenAI client
-client = OpenAI()
+# Initialize OpenAI client (retries are handled by EnrichmentExecutor)
+client = OpenAI(max_retries=0)
 
-# Scoring weights
-PROMINENCE_SCORES = {
-    'top_story': 100,
-    'featured': 80,
-    'main': 60,
-    'news_feed': 40
-}
+# Scoring weights (the 'homepage' profile in scoring.json)
+PROFILE = get_profile('homepage')
+PROMINENCE_SCORES = PROFILE['prominence']['scores']
+RECENCY = PROFILE['recency']
+TOPIC_SCORES = PROFILE['topic']['scores']
 
-RECENCY_SCORES = {
-    'minutes': 100,
-    'hours': 80,
-    'yesterday': 60,
-    'days_ago': 40
-}
+def story_age_hours(time_str, now=None):
+    """Hours since a story's printed time; NaN if the time is missing or unrecognised"""
+    hours = age_hours(time_str, now)
+    return float('nan') if hours is None else hours
 
-TOPIC_SCORES = {
-    'ukraine_conflict': 20,
-    'international': 15,
-    'domestic_politics': 15,
-    'economy': 10,
-    'society': 10,
-    'culture': 5
-}
-
-def parse_time(time_str):
+def parse_time(time_str, now=None):
     """Parse time string and return recency score"""
-    if not time_str:
-        return RECENCY_SCORES['days_ago']
-    
-    time_lower = time_str.lower()
-    if 'минут' in time_lower or 'minute' in time_lower:
-        return RECENCY_SCORES['minutes']
-    elif 'час' in time_lower or 'hour' in time_lower:
-        return RECENCY_SCORES['hours']
-    elif 'вчера' in time_lower or 'yesterday' in time_lower:
-        return RECENCY_SCORES['yesterday']
-    else:
-        return RECENCY_SCORES['days_ago']
+    return int(score_columns({'recency': RECENCY}, 1, recency_hours=[story_age_hours(time_str, now)])[0])
 
 def classify_topic(title):
     """Classify story topic based on keywords"""
-    title_lower = title.lower()
-    
-    # Ukraine conflict keywords
-    ukraine_keywords = ['украин', 'всу', 'зеленск', 'киев', 'донбасс', 'красноармейск', 'спецоперац', 'сво']
-    if any(kw in title_lower for kw in ukraine_keywords):
-        return 'ukraine_conflict', TOPIC_SCORES['ukraine_conflict']
-    
-    # International keywords
-    intl_keywords = ['сша', 'трамп', 'байден', 'европ', 'венесуэл', 'путин', 'лавров', 'nato', 'нато']
-    if any(kw in title_lower for kw in intl_keywords):
-        return 'international', TOPIC_SCORES['international']
-    
-    # Domestic politics keywords
-    politics_keywords = ['путин', 'совбез', 'правительств', 'минобороны', 'дума', 'закон']
-    if any(kw in title_lower for kw in politics_keywords):
-        return 'domestic_politics', TOPIC_SCORES['domestic_politics']
-    
-    # Economy keywords
-    economy_keywords = ['экономик', 'рубл', 'банк', 'цб', 'ставк', 'инфляц', 'налог', 'кредит']
-    if any(kw in title_lower for kw in economy_keywords):
-        return 'economy', TOPIC_SCORES['economy']
-    
-    # Default to society
-    return 'society', TOPIC_SCORES['society']
+    topic = classify(title).topic
+    return topic, TOPIC_SCORES[topic]
 
 def read_stories_file(filepath, source):
-    """Read and parse stories from text file"""
-    stories = []
-    
+    """Read and parse stories from text file (see stories_file.py for the format)"""
     if not os.path.exists(filepath):
         print(f"Warning: {filepath} not found")
-        return stories
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Split by numbered entries
-    lines = content.split('\n')
-    current_story = {}
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # Check if line starts with a number (new story)
-        if line and line[0].isdigit() and '. ' in line[:5]:
-            # Save previous story
-            if current_story and 'title' in current_story:
-                stories.append(current_story)
-            
-            # Start new story
-            title = line.split('. ', 1)[1] if '. ' in line else line
-            current_story = {
-                'title': title,
-                'source': source,
-                'prominence': 'main',
-                'time': '',
-                'category': ''
-            }
-        elif 'Prominence:' in line:
-            current_story['prominence'] = line.split(':', 1)[1].strip()
-        elif 'Time:' in line:
-            current_story['time'] = line.split(':', 1)[1].strip()
-        elif 'Category:' in line or 'Tag:' in line:
-            current_story['category'] = line.split(':', 1)[1].strip()
-    
-    # Add last story
-    if current_story and 'title' in current_story:
-        stories.append(current_story)
-    
-    return stories
+        return []
+    return list(read_stories(filepath, source))
+
+def calculate_viral_scores(stories):
+    """Score all stories in one vectorized pass; sets 'topic' and 'viral_score' on each"""
+    topics = [classify_topic(story['title'])[0] for story in stories]
+    now = datetime.now(MSK)
+    scores = score_stories(
+        stories, 'homepage',
+        prominence=[story.get('prominence', 'main') for story in stories],
+        recency_hours=[story_age_hours(story.get('time', ''), now) for story in stories],
+        topic=topics,
+    )
+    for story, topic, score in zip(stories, topics, scores.tolist()):
+        story['topic'] = topic
+        story['viral_score'] = score
+    return scores
 
 def calculate_viral_score(story):
     """Calculate viral score for a story"""
-    # Base score from prominence
-    prominence = story.get('prominence', 'main')
-    score = PROMINENCE_SCORES.get(prominence, 50)
-    
-    # Add recency score
-    time_str = story.get('time', '')
-    score += parse_time(time_str)
-    
-    # Add topic score
-    topic, topic_score = classify_topic(story['title'])
-    score += topic_score
-    story['topic'] = topic
-    
-    return score
+    return int(calculate_viral_scores([story])[0])
 
-def enhance_story_with_ai(story):
-    """Enhance a single story with AI-generated summaries and translations"""
-    print(f"\nEnhancing story: {story['title'][:60]}...")
-    
-    # 1. Translate title to English
-    response = client.chat.completions.create(
+def translate_title(title_ru, executor=None):
+    """English translation of a Russian headline"""
+    response = cached_completion(
+        client,
         model="gpt-4.1-mini",
+        executor=executor,
         messages=[
             {"role": "system", "content": "You are a professional translator. Translate the following Russian news headline to English. Provide only the translation."},
-            {"role": "user", "content": story['title']}
+            {"role": "user", "content": title_ru}
         ]
     )
-    story['title_en'] = response.choices[0].message.content.strip()
-    story['title_ru'] = story['title'] # Keep original Russian title
-    story['title'] = story['title_en'] # Set main title to English
-    print(f"  EN Title: {story['title_en'][:60]}...")
-    
-    # 2. Generate comprehensive English summary
-    response = client.chat.completions.create(
+    return response.strip()
+
+def summarize_en(title_en, title_ru, executor=None):
+    """Comprehensive English summary"""
+    response = cached_completion(
+        client,
         model="gpt-4.1-mini",
+        executor=executor,
         messages=[
             {"role": "system", "content": "You are a professional news summarizer. Create a comprehensive 2-3 sentence summary of the news story based on the title. Make it informative and engaging."},
-            {"role": "user", "content": f"Title: {story['title_en']}\nRussian Title: {story['title_ru']}"}
+            {"role": "user", "content": f"Title: {title_en}\nRussian Title: {title_ru}"}
         ]
     )
-    story['summary'] = response.choices[0].message.content.strip()
-    print(f"  EN Summary: {story['summary'][:60]}...")
-    
-    # 3. Generate comprehensive Russian summary
-    response = client.chat.completions.create(
+    return response.strip()
+
+def summarize_ru(title_ru, executor=None):
+    """Comprehensive Russian summary"""
+    response = cached_completion(
+        client,
         model="gpt-4.1-mini",
+        executor=executor,
         messages=[
             {"role": "system", "content": "Вы профессиональный новостной редактор. Создайте подробное резюме из 2-3 предложений для новостной статьи на основе заголовка."},
-            {"role": "user", "content": f"Заголовок: {story['title_ru']}"}
+            {"role": "user", "content": f"Заголовок: {title_ru}"}
         ]
     )
-    story['summary_ru'] = response.choices[0].message.content.strip()
-    
-    # 4. Generate 'Why Trending' explanation
-    response = client.chat.completions.create(
+    return response.strip()
+
+def explain_trending(title_en, topic, executor=None):
+    """'Why Trending' explanation"""
+    response = cached_completion(
+        client,
         model="gpt-4.1-mini",
+        executor=executor,
         messages=[
             {"role": "system", "content": "You are a news analyst. Explain in 1-2 sentences why this story is trending in Russian media, based on its topic and significance."},
-            {"role": "user", "content": f"Title: {story['title_en']}\nTopic: {story['topic']}"}
+            {"role": "user", "content": f"Title: {title_en}\nTopic: {topic}"}
         ]
     )
-    story['why_trending'] = response.choices[0].message.content.strip()
-    story['why_trending_ru'] = f"Эта новость в тренде из-за её актуальности и важности для российской аудитории."
-    
+    return response.strip()
+
+PLACEHOLDER_WHY_TRENDING_RU = "Эта новость в тренде из-за её актуальности и важности для российской аудитории."
+
+# Bilingual fields requested in one structured response per story
+ENRICHMENT_FIELDS = {
+    'title_en': "English translation of the Russian headline",
+    'summary': "Comprehensive, informative 2-3 sentence English summary of the story",
+    'summary_ru': "Подробное резюме новости из 2-3 предложений на русском языке",
+    'why_trending': "1-2 English sentences on why the story is trending in Russian media",
+    'why_trending_ru': "1-2 предложения на русском о том, почему новость в тренде в российских СМИ",
+}
+
+def enrichment_response_format(fields):
+    """JSON-schema response format requiring the given enrichment fields"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "story_enrichment",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    field: {"type": "string", "description": ENRICHMENT_FIELDS[field]}
+                    for field in fields
+                },
+                "required": list(fields),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+def parse_enrichment(content, fields):
+    """Non-empty string fields of a structured response; invalid JSON yields {}"""
+    try:
+        data = json.loads(content or '')
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        field: data[field].strip()
+        for field in fields
+        if isinstance(data.get(field), str) and data[field].strip()
+    }
+
+def request_enrichment(title_ru, topic, fields, executor=None):
+    """Ask for the given enrichment fields of one story in a single call"""
+    response = cached_completion(
+        client,
+        model="gpt-4.1-mini",
+        executor=executor,
+        messages=[
+            {"role": "system", "content": "You are a bilingual Russian/English news editor. For the Russian news headline, fill in every requested field. English fields must be in English, fields ending in _ru in Russian."},
+            {"role": "user", "content": f"Заголовок: {title_ru}\nTopic: {topic}"}
+        ],
+        response_format=enrichment_response_format(fields)
+    )
+    return parse_enrichment(response, fields)
+
+def enrich_structured(title_ru, topic, executor=None):
+    """(all enrichment fields, completions requested) for one story, re-asking only for fields the first answer missed"""
+    result = request_enrichment(title_ru, topic, list(ENRICHMENT_FIELDS), executor)
+    completions = 1
+    missing = [field for field in ENRICHMENT_FIELDS if field not in result]
+    if missing:
+        print(f"  Re-asking for missing fields: {', '.join(missing)}")
+        result.update(request_enrichment(title_ru, topic, missing, executor))
+        completions += 1
+
+    # Last resort: the per-field prompts
+    if 'title_en' not in result:
+        result['title_en'] = translate_title(title_ru, executor)
+        completions += 1
+    if 'summary' not in result:
+        result['summary'] = summarize_en(result['title_en'], title_ru, executor)
+        completions += 1
+    if 'summary_ru' not in result:
+        result['summary_ru'] = summarize_ru(title_ru, executor)
+        completions += 1
+    if 'why_trending' not in result:
+        result['why_trending'] = explain_trending(result['title_en'], topic, executor)
+        completions += 1
+    if 'why_trending_ru' not in result:
+        result['why_trending_ru'] = PLACEHOLDER_WHY_TRENDING_RU
+    return result, completions
+
+# Nominal LLM calls per story in each enrichment mode
+CALLS_PER_STORY = {'structured': 1, 'per-field': 4}
+
+def enhance_stories_with_ai(stories, executor=None, mode='structured', memory=TRANSLATION_MEMORY):
+    """Enhance stories with AI-generated summaries and translations
+
+    Headlines found in the translation memory (verbatim or lightly reworded)
+    reuse their stored fields. 'structured' asks for all bilingual fields of
+    the rest in one JSON response per story. 'per-field' makes one call per
+    field: the English title and the Russian summary only need the Russian
+    title, so they are requested for every story at once; the English summary
+    and the 'why trending' text follow in a second concurrent round.
+    """
+    executor = executor or EnrichmentExecutor()
+    # Per-field mode only has a placeholder for why_trending_ru, so that is
+    # neither stored nor required
+    fields = [field for field in ENRICHMENT_FIELDS if mode == 'structured' or field != 'why_trending_ru']
+    pending = []
+    for story in stories:
+        print(f"\nEnhancing story: {story['title'][:60]}...")
+        story['title_ru'] = story['title'] # Keep original Russian title
+        remembered = memory.lookup(story['title_ru'], fields)
+        if remembered:
+            story.setdefault('why_trending_ru', PLACEHOLDER_WHY_TRENDING_RU)
+            story.update(remembered)
+            story['title'] = story['title_en']
+            memory.count_calls(avoided=CALLS_PER_STORY[mode])
+            print(f"  From translation memory: {story['title_en'][:60]}...")
+        else:
+            pending.append(story)
+
+    if mode == 'structured':
+        results = executor.map(lambda story: enrich_structured(story['title_ru'], story['topic'], executor), pending)
+        for story, (result, completions) in zip(pending, results):
+            story.update(result)
+            # Keep headlines that are already English verbatim
+            story['title_en'] = memory.english_title(story['title_ru']) or story['title_en']
+            story['title'] = story['title_en'] # Set main title to English
+            # Incomplete answers cost more than CALLS_PER_STORY
+            memory.count_calls(made=completions)
+            print(f"  EN Title: {story['title_en'][:60]}...")
+    else:
+        _enhance_per_field(pending, executor, memory)
+
+    for story in pending:
+        memory.store(story['title_ru'], {field: story[field] for field in fields
+                                         if story[field] != PLACEHOLDER_WHY_TRENDING_RU})
+    return stories
+
+def _enhance_per_field(stories, executor, memory):
+    # 1. English title (unless already English) and Russian summary
+    titles_en = [memory.english_title(story['title_ru']) for story in stories]
+    calls = [lambda story=story: summarize_ru(story['title_ru'], executor) for story in stories]
+    calls += [lambda story=story: translate_title(story['title_ru'], executor)
+              for story, title_en in zip(stories, titles_en) if title_en is None]
+    results = executor.run_all(calls)
+    translations = iter(results[len(stories):])
+    for story, title_en, summary_ru in zip(stories, titles_en, results):
+        story['title_en'] = title_en or next(translations)
+        story['title'] = story['title_en'] # Set main title to English
+        story['summary_ru'] = summary_ru
+    memory.count_calls(made=len(calls), avoided=2 * len(stories) - len(calls))
+
+    # 2. English summary and 'Why Trending' explanation
+    results = executor.run_all(
+        [call for story in stories for call in (
+            lambda story=story: summarize_en(story['title_en'], story['title_ru'], executor),
+            lambda story=story: explain_trending(story['title_en'], story['topic'], executor),
+        )]
+    )
+    for story, summary, why_trending in zip(stories, results[0::2], results[1::2]):
+        story['summary'] = summary
+        story['why_trending'] = why_trending
+        story['why_trending_ru'] = PLACEHOLDER_WHY_TRENDING_RU
+        print(f"  EN Title: {story['title_en'][:60]}...")
+    memory.count_calls(made=len(results))
+
+def enhance_story_with_ai(story, executor=None, mode='structured'):
+    """Enhance a single story with AI-generated summaries and translations"""
+    return enhance_stories_with_ai([story], executor, mode)[0]
+
+# History sources whose published rankings carry LLM-generated text
+ENRICHED_SOURCES = ('analyze_stories', 'pipeline-llm')
+
+def load_previous_enrichment(path='public/viral_russia_news.json', history=None):
+    """AI-enriched fields from the last published run, keyed by Russian title
+
+    Read from the history store; the published JSON is only used before the
+    store has an enriched run, and only its translated stories count there
+    (template output has title == title_ru and template summaries).
+    """
+    stories = (history or HistoryStore()).latest_ranking(ENRICHED_SOURCES)
+    translated_only = not stories
+    if translated_only:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stories = json.load(f).get('stories', [])
+        except (OSError, ValueError):
+            return {}
+    previous = {}
+    for story in stories:
+        if not (story.get('title_ru') and story.get('summary_ru')):
+            continue
+        if translated_only and story.get('title') == story['title_ru']:
+            continue
+        previous[story['title_ru']] = story
+    return previous
+
+def reuse_enrichment(story, previous):
+    """Copy translations and summaries from an earlier run onto a carried-over story"""
+    print(f"\nReusing enrichment for: {story['title'][:60]}...")
+    story['title_en'] = previous['title']
+    story['title_ru'] = story['title']
+    story['title'] = story['title_en']
+    for key in ('summary', 'summary_ru', 'why_trending', 'why_trending_ru'):
+        story[key] = previous.get(key, '')
     return story
 
 def main():
+    parser = argparse.ArgumentParser(description='Score collected stories and enrich the top 15 with AI')
+    parser.add_argument('--enrichment', choices=['structured', 'per-field'], default='structured',
+                        help='one JSON response per story, or one call per field')
+    args = parser.parse_args()
+
     # Read stories from all sources
     all_stories = []
     
-    sources = {
-        'RT Russian': 'data/rt_stories.txt',
-        'TASS': 'data/tass_stories.txt',
-        'RIA Novosti': 'data/ria_stories.txt',
-        'Rossiyskaya Gazeta': 'data/rg_stories.txt',
-        'Komsomolskaya Pravda': 'data/kp_stories.txt',
-        'Lenta.ru': 'data/lenta_stories.txt'
-    }
-    
-    for source_name, filepath in sources.items():
-        stories = read_stories_file(filepath, source_name)
+    for outlet in load_registry():
+        stories = read_stories_file(outlet.stories_file, outlet.name)
         all_stories.extend(stories)
     
     print(f"Total stories collected: {len(all_stories)}")
+    seen = SeenIndex()
+    new_count, carried_over = seen.mark_stories(all_stories)
+    print(f"New stories: {new_count}, carried over from earlier runs: {carried_over}")
     
     # Calculate viral scores
-    for story in all_stories:
-        story['viral_score'] = calculate_viral_score(story)
+    scores = calculate_viral_scores(all_stories)
     
     # Sort by viral score
-    all_stories.sort(key=lambda x: x['viral_score'], reverse=True)
+    all_stories = [all_stories[i] for i in rank(scores)]
     
     # Get top 15
     top_stories_raw = all_stories[:15]
     
     # Enhance top 15 stories with AI
     print("\n=== ENHANCING TOP 15 STORIES WITH AI ===\n")
-    top_stories = [enhance_story_with_ai(story) for story in top_stories_raw]
+    # Carried-over stories keep last run's translations instead of new API calls
+    previous = load_previous_enrichment()
+    to_enhance = []
+    for story in top_stories_raw:
+        if not story['is_new'] and story['title'] in previous:
+            reuse_enrichment(story, previous[story['title']])
+        else:
+            to_enhance.append(story)
+    enhance_stories_with_ai(to_enhance, mode=args.enrichment)
+    top_stories = top_stories_raw
     
     # Print results
     print("\n=== TOP 15 VIRAL RUSSIA NEWS ===\n")
@@ -234,7 +372,7 @@ def main():
     final_data = {
         'generated_at': datetime.now().strftime('%B %d, %Y at %I:%M %p UTC'),
         'collection_period': datetime.now().strftime('%Y-%m-%d'),
-        'total_outlets': 6,
+        'total_outlets': len(load_registry()),
         'stories': []
     }
     
@@ -256,11 +394,22 @@ def main():
             'tags': [story['topic'], story.get('prominence', 'featured'), story.get('category', '')]
         })
 
+    history = HistoryStore()
+    history.record_run(
+        'analyze_stories', all_stories,
+        scores={'profile': 'homepage', 'headlines': [story['viral_score'] for story in all_stories]},
+        ranking=final_data['stories'],
+    )
+
     # Write to final JSON file for the website
-    with open('public/viral_russia_news.json', 'w', encoding='utf-8') as f:
-        json.dump(final_data, f, ensure_ascii=False, indent=2)
+    changed = publish_json('public/viral_russia_news.json', final_data)
+    metadata = {key: value for key, value in final_data.items() if key != 'stories'}
+    changed = write_site('public', metadata, final_data['stories'], history) or changed
     
-    print("\n✓ Website JSON created at public/viral_russia_news.json")
+    if changed:
+        print("\n✓ Website JSON created at public/viral_russia_news.json")
+    else:
+        print("\n✓ Ranked stories unchanged; public/viral_russia_news.json left as it is")
 
     # Save raw analysis to data/viral_stories.json
     output_data = {
@@ -282,9 +431,11 @@ def main():
         })
     
     # Write to JSON file
-    with open("data/viral_stories.json", 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    publish_json("data/viral_stories.json", output_data)
     
+    seen.save()
+    print(LLM_CACHE.report())
+    print(TRANSLATION_MEMORY.report())
     print("✓ Analysis complete! Results saved to data/viral_stories.json")
 
 if __name__ == '__main__':
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Check that concurrent collection takes about as long as the slowest host
+Serves synthetic homepages for every registry outlet from a local stub server
+that answers each outlet after its own latency, and collects two pages per
+outlet through collect_all, serially and then concurrently. Requests go
+through fetch_page and its HostThrottle, so the two pages of an outlet are
+spaced by the politeness delay: the concurrent run should take about the
+slowest host's time, the delay plus its latency, instead of the sum.
+Exits non-zero if the concurrent run is more than --tolerance slower than
+that, if two requests to one host arrived closer together than the delay,
+or if the two runs extracted different headlines.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote, unquote, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import collect_and_generate  # noqa: E402
+import corpus  # noqa: E402
+from collect_and_generate import POLITENESS_DELAY, collect_all, extract_outlet_news  # noqa: E402
+from outlets import load_registry  # noqa: E402
+from transport import TRANSPORT  # noqa: E402
+
+# Requests to one host may reach the server a little closer together than
+# the throttle spaced them, by the difference in connection set-up time
+ARRIVAL_SLACK = 0.05
+
+class StubSite:
+    """Local server for a set of URLs, each answered after its host's latency
+
+    TRANSPORT.rewrite sends every request here with the original URL in the
+    path; arrival times are kept per original host.
+    """
+
+    def __init__(self, pages, latencies):
+        self.pages = pages
+        self.latencies = latencies
+        self.arrivals = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def rewrite(self, url):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/{quote(url, safe='')}"
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = unquote(self.path[1:])
+                host = urlparse(url).netloc
+                with site._lock:
+                    site.arrivals.setdefault(host, []).append(time.monotonic())
+                time.sleep(site.latencies.get(host, 0))
+                body = site.pages.get(url)
+                self.send_response(200 if body else 404)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body or b'')))
+                self.end_headers()
+                self.wfile.write(body or b'')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+def outlet_urls(outlet):
+    """The homepage and a second page on the same host"""
+    return [outlet.url, outlet.url.rstrip('/') + '/news/?page=2']
+
+def build_site(outlets, min_latency, max_latency):
+    """StubSite with two synthetic pages per outlet, latencies spread evenly across the outlets"""
+    pages = {}
+    by_outlet = {}
+    for outlet, html in corpus.outlet_pages(corpus.generate(len(outlets) * 200)):
+        by_outlet.setdefault(outlet.id, []).append(html.encode('utf-8'))
+    latencies = {}
+    for i, outlet in enumerate(outlets):
+        step = (max_latency - min_latency) / max(len(outlets) - 1, 1)
+        latencies[urlparse(outlet.url).netloc] = min_latency + i * step
+        bodies = by_outlet.get(outlet.id, [b''])
+        for j, url in enumerate(outlet_urls(outlet)):
+            pages[url] = bodies[j % len(bodies)]
+    return StubSite(pages, latencies)
+
+def closest_arrivals(arrivals):
+    """(seconds, host) of the two requests to one host that arrived closest together"""
+    closest = (float('inf'), None)
+    for host, times in arrivals.items():
+        times = sorted(times)
+        for earlier, later in zip(times, times[1:]):
+            closest = min(closest, (later - earlier, host))
+    return closest
+
+def timed_collect(site, extractors, concurrent, delay):
+    """(wall seconds, stories) of one collect_all run, with fresh arrival records"""
+    # Let the previous run's throttle slots expire
+    time.sleep(delay)
+    site.arrivals.clear()
+    started = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stories = collect_all(extractors, concurrent=concurrent)
+    return time.monotonic() - started, stories
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min-latency', type=float, default=0.2, help="seconds, fastest outlet")
+    parser.add_argument('--max-latency', type=float, default=1.0, help="seconds, slowest outlet")
+    parser.add_argument('--delay', type=float, default=POLITENESS_DELAY,
+                        help="politeness delay between requests to one host")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed excess over the slowest host (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    outlets = list(load_registry())
+    site = build_site(outlets, args.min_latency, args.max_latency).start()
+    TRANSPORT.rewrite = site.rewrite
+    collect_and_generate.HTTP_CACHE = None
+    collect_and_generate.THROTTLE.delay = args.delay
+    extractors = [partial(extract_outlet_news, outlet, url) for outlet in outlets for url in outlet_urls(outlet)]
+
+    failures = 0
+    try:
+        serial_seconds, serial_stories = timed_collect(site, extractors, False, args.delay)
+        concurrent_seconds, concurrent_stories = timed_collect(site, extractors, True, args.delay)
+        gap, host = closest_arrivals(site.arrivals)
+    finally:
+        TRANSPORT.rewrite = None
+        site.stop()
+
+    slowest = max(site.latencies.values())
+    # The second page of the slowest outlet may start one delay after its first
+    bound = args.delay + slowest
+    print(f"{len(extractors)} pages from {len(outlets)} outlets, latency {args.min_latency:.2f}-"
+          f"{slowest:.2f}s, politeness delay {args.delay:.2f}s\n")
+    print(f"{'slowest host':14s} {bound:7.2f}s  (delay + slowest latency)")
+    print(f"{'serial':14s} {serial_seconds:7.2f}s  {serial_seconds / bound:5.2f}x slowest host")
+    print(f"{'concurrent':14s} {concurrent_seconds:7.2f}s  {concurrent_seconds / bound:5.2f}x slowest host")
+    print(f"closest same-host requests in the concurrent run: {gap:.2f}s apart ({host})")
+
+    if concurrent_seconds > bound * (1 + args.tolerance):
+        print(f"FAIL: concurrent run took more than {1 + args.tolerance:.2f}x the slowest host")
+        failures += 1
+    if gap < args.delay - ARRIVAL_SLACK:
+        print(f"FAIL: requests to {host} arrived {gap:.2f}s apart, under the {args.delay:.2f}s delay")
+        failures += 1
+    if concurrent_stories != serial_stories:
+        print("FAIL: concurrent and serial runs extracted different headlines")
+        failures += 1
+    if not concurrent_stories:
+        print("FAIL: no headlines extracted")
+        failures += 1
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Scaling of the process-pool parse stage with worker count
+Parses a batch of homepages (a recorded collection run, repeated to --pages,
+or synthetic outlet pages when there is no recording) with 1, 2, 4, ... up to
+--max-workers processes and reports pages/s, speedup and parallel efficiency.
+Every run with more than one worker uses the pool, whatever the batch size
+(parse_pool's small-batch serial fallback is switched off). Also measures
+the pool's start-up cost and, from it and the serial parse rate, the batch
+size above which a pool pays off, to check parse_pool.MIN_POOL_CHARS against.
+Exits non-zero if any worker count extracts different headlines than the
+serial parse.
+Record a run first with: python pipeline.py --record fixtures/recordings
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import corpus  # noqa: E402
+import parse_pool  # noqa: E402
+from outlets import load_registry  # noqa: E402
+from replay import FIXTURES_DIR, load_index  # noqa: E402
+
+def recorded_pages(fixtures_dir):
+    """[(outlet id, raw page bytes)] for every outlet homepage in a recording"""
+    index = load_index(fixtures_dir)
+    pages = []
+    for outlet in load_registry():
+        entry = index.get(outlet.url)
+        if entry and entry['status'] == 200:
+            pages.append((outlet.id, (Path(fixtures_dir) / entry['file']).read_bytes()))
+    return pages
+
+def synthetic_pages(count):
+    """[(outlet id, html)] of about count synthetic homepages"""
+    rows = corpus.generate(count * 50)
+    return [(outlet.id, html) for outlet, html in corpus.outlet_pages(rows)]
+
+def pool_startup(workers, outlet_id):
+    """Seconds to start a pool and have every worker load the registry and parser"""
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=parse_pool.pool_context()) as executor:
+        list(executor.map(parse_pool._headlines, [outlet_id] * workers, ['<html></html>'] * workers))
+    return time.perf_counter() - started
+
+def crossover_chars(startup, chars_per_second, workers):
+    """Batch size at which parsing on workers processes saves the pool's start-up cost"""
+    # serial: chars / rate; pool: startup + chars / (rate * workers)
+    return startup * chars_per_second * workers / (workers - 1)
+
+def worker_counts(maximum):
+    counts = []
+    workers = 1
+    while workers < maximum:
+        counts.append(workers)
+        workers *= 2
+    return counts + [maximum]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR, help="recording to parse")
+    parser.add_argument('--pages', type=int, default=512, help="pages per batch")
+    parser.add_argument('--max-workers', type=int, default=parse_pool.cpu_count())
+    parser.add_argument('--repeat', type=int, default=3, help="runs per worker count; the fastest counts")
+    args = parser.parse_args()
+
+    pages = recorded_pages(args.fixtures)
+    source = f"recording {args.fixtures}"
+    if not pages:
+        pages = synthetic_pages(args.pages)
+        source = "synthetic pages (no recording found)"
+    pages = (pages * (args.pages // len(pages) + 1))[:args.pages]
+    megabytes = sum(len(page) for _, page in pages) / 2 ** 20
+    print(f"{len(pages)} pages, {megabytes:.1f} MB, from {source}; {parse_pool.cpu_count()} CPUs usable")
+    if args.max_workers > parse_pool.cpu_count():
+        print(f"Warning: more workers than CPUs; speedup beyond {parse_pool.cpu_count()}x is not possible here")
+
+    # The first pool in a process also starts the forkserver; the pipeline
+    # parses once per run, so that is the cost it pays
+    outlet_id = pages[0][0]
+    startup = [pool_startup(2, outlet_id) for _ in range(3)]
+    started = time.perf_counter()
+    parse_pool.parse_pages(pages, 1)
+    chars_per_second = sum(len(page) for _, page in pages) / (time.perf_counter() - started)
+    print(f"Pool start-up {startup[0]:.3f}s for the first pool in a process, {min(startup[1:]):.3f}s after; "
+          f"serial parse {chars_per_second / 1e6:.0f}M chars/s")
+    for workers in (2, 4, 8):
+        print(f"  pays off with {workers} workers above {crossover_chars(startup[0], chars_per_second, workers) / 1e6:.0f}M chars")
+    print(f"  parse_pool.MIN_POOL_CHARS is {parse_pool.MIN_POOL_CHARS / 1e6:.0f}M chars")
+
+    expected = None
+    serial_seconds = None
+    failures = 0
+    print(f"\n{'workers':>7s} {'chunk':>6s} {'seconds':>8s} {'pages/s':>8s} {'speedup':>8s} {'efficiency':>10s}")
+    for workers in worker_counts(args.max_workers):
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = parse_pool.parse_pages(pages, workers, min_chars=0)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        if expected is None:
+            expected, serial_seconds = results, best
+        elif results != expected:
+            print(f"MISMATCH: {workers} workers extracted different headlines")
+            failures += 1
+        speedup = serial_seconds / best
+        chunk = parse_pool.chunk_size(len(pages), workers) if parse_pool.use_pool(pages, workers, min_chars=0) else '-'
+        print(f"{workers:7d} {chunk:>6} {best:8.3f} {len(pages) / best:8.0f} {speedup:7.2f}x {speedup / workers:9.0%}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the HTML parser backends on recorded outlet homepages
+Pages are read from <pages>/<outlet_id>*.html; --record fetches the live
+homepages first. Without recorded pages, synthetic homepages from corpus.py
+(with script and style noise in the headline markup) are used instead.
+Exits non-zero if any backend extracts different headlines.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import corpus  # noqa: E402
+from html_parsers import available_backends  # noqa: E402
+from outlets import load_registry, extract_stories  # noqa: E402
+
+def record_pages(pages_dir):
+    """Fetch every outlet homepage into pages_dir"""
+    from collect_and_generate import fetch_page
+
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    for outlet in load_registry():
+        html = fetch_page(outlet.url)
+        if html:
+            (pages_dir / f"{outlet.id}.html").write_text(html, encoding='utf-8')
+            print(f"Recorded {outlet.id}: {len(html)} chars")
+
+def load_pages(pages_dir):
+    """Return [(outlet, html)] for every recorded page that maps to an outlet"""
+    pages = []
+    for outlet in load_registry():
+        for path in sorted(pages_dir.glob(f"{outlet.id}*.html")):
+            pages.append((outlet, path.read_text(encoding='utf-8')))
+    return pages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', default='fixtures/pages', type=Path,
+                        help="directory with recorded homepages")
+    parser.add_argument('--record', action='store_true', help="fetch live homepages first")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--synthetic', type=int, default=5_000,
+                        help="headlines in the synthetic pages used when none are recorded")
+    args = parser.parse_args()
+
+    if args.record:
+        record_pages(args.pages)
+    pages = load_pages(args.pages)
+    source = f"recorded in {args.pages}"
+    if not pages:
+        pages = corpus.outlet_pages(corpus.generate(args.synthetic))
+        source = f"synthetic (no recorded pages in {args.pages})"
+    total_chars = sum(len(html) for _, html in pages)
+    print(f"{len(pages)} pages {source}, {total_chars / 1024:.0f} KB of HTML, {args.repeat} repeats\n")
+
+    reference = None
+    mismatches = 0
+    baseline_time = None
+    for backend in reversed(available_backends()):  # html.parser first as the reference
+        results = [extract_stories(outlet, html, backend) for outlet, html in pages]
+        if reference is None:
+            reference = results
+        elif results != reference:
+            mismatches += 1
+            print(f"  {backend}: headlines differ from html.parser")
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for outlet, html in pages:
+                extract_stories(outlet, html, backend)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        baseline_time = baseline_time or elapsed
+        headlines = sum(len(r) for r in results)
+        print(f"{backend:12s} {elapsed * 1000:8.1f} ms/run  {baseline_time / elapsed:5.1f}x  "
+              f"{headlines} headlines")
+
+    return 1 if mismatches else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
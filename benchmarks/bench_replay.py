@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark the full pipeline offline against a recorded collection run
+Each run starts from an empty working directory (no HTTP cache, seen index or
+history), replays the recording through the local server and reports the
+stage timings. Exits non-zero if the runs rank different stories, or if they
+differ from the expected ranking stored with --update-expected.
+Record a run first with: python pipeline.py --record fixtures/recordings
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import collect_and_generate  # noqa: E402
+import pipeline  # noqa: E402
+from history import HistoryStore  # noqa: E402
+from momentum import MomentumTracker  # noqa: E402
+from replay import FIXTURES_DIR, start_replay  # noqa: E402
+from seen_index import SeenIndex  # noqa: E402
+
+EXPECTED_NAME = 'expected_ranking.json'
+
+def ranking(records):
+    """The part of the output a replay must reproduce: stories and their outlets, in rank order"""
+    # Scores are left out: recency ages the recorded publication times
+    return [[record['title'], sorted(record['outlets'])] for record in records]
+
+def run_once(fixtures, replay_options, enrich):
+    """(ranking, stage timings, replay server) of one pipeline run in a fresh directory"""
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        os.makedirs('public')
+        server = start_replay(pipeline.TRANSPORT, fixtures, **replay_options)
+        try:
+            args = pipeline.build_parser().parse_args(['--replay', str(fixtures), '--enrich', enrich])
+            collect_and_generate.HTTP_CACHE = None
+            context = {'args': args, 'seen': SeenIndex(), 'history': HistoryStore(), 'momentum': MomentumTracker()}
+            with contextlib.redirect_stdout(io.StringIO()):
+                records, timings = pipeline.run_pipeline(context)
+            context['history'].close()
+        finally:
+            server.stop()
+            pipeline.TRANSPORT.rewrite = None
+            os.chdir(previous_dir)
+    return ranking(records), timings, server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR, help="recording to replay")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="up to this many seconds more")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-politeness', action='store_true',
+                        help="drop the per-host delay between requests")
+    parser.add_argument('--enrich', choices=['template', 'llm'], default='template')
+    parser.add_argument('--update-expected', action='store_true',
+                        help=f"store this ranking as {EXPECTED_NAME} in the fixtures directory")
+    args = parser.parse_args()
+
+    fixtures = args.fixtures.resolve()
+    if args.no_politeness:
+        collect_and_generate.THROTTLE.delay = 0
+    replay_options = {'latency': args.latency, 'jitter': args.jitter,
+                      'error_rate': args.error_rate, 'seed': args.seed}
+
+    rankings = []
+    totals = {}
+    for run in range(args.runs):
+        result, timings, server = run_once(fixtures, replay_options, args.enrich)
+        rankings.append(result)
+        for name, seconds in timings.items():
+            totals.setdefault(name, []).append(seconds)
+        print(f"run {run + 1}: {sum(timings.values()):6.2f}s, {server.requests} requests "
+              f"({server.errors} simulated errors), {len(result)} stories")
+
+    print(f"\n{'stage':8s} {'best':>8s} {'mean':>8s}")
+    for name, samples in totals.items():
+        print(f"{name:8s} {min(samples):8.3f} {sum(samples) / len(samples):8.3f}")
+
+    failures = 0
+    if any(result != rankings[0] for result in rankings[1:]):
+        print("MISMATCH: replayed runs ranked different stories")
+        failures += 1
+
+    expected_path = fixtures / EXPECTED_NAME
+    if args.update_expected:
+        expected_path.write_text(json.dumps(rankings[0], ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+        print(f"Stored expected ranking in {expected_path}")
+    elif expected_path.exists():
+        if json.loads(expected_path.read_text(encoding='utf-8')) != rankings[0]:
+            print(f"MISMATCH: ranking differs from {expected_path}")
+            failures += 1
+        else:
+            print(f"Ranking matches {expected_path}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Throughput of the streaming stories-file reader
+Writes one large synthetic stories file (numbered, bulleted and Title: entries)
+and reads it with stories_file.read_stories, reporting lines/s, MB/s and the
+Python heap peak, next to the previous read-everything-then-split reader.
+The streaming reader's peak should stay flat as --size grows.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import corpus  # noqa: E402
+from outlets import load_registry  # noqa: E402
+from stories_file import read_stories  # noqa: E402
+from story import Story  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+def read_split(path, outlet):
+    """The reader analyze_stories used before stories_file (numbered entries only)"""
+    stories = []
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    current = {}
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line[0].isdigit() and '. ' in line[:5]:
+            if 'title' in current:
+                stories.append(Story(**current))
+            current = {'title': line.split('. ', 1)[1], 'outlet': outlet,
+                       'prominence': 'main', 'time': '', 'category': ''}
+        elif 'Prominence:' in line:
+            current['prominence'] = line.split(':', 1)[1].strip()
+        elif 'Time:' in line:
+            current['time'] = line.split(':', 1)[1].strip()
+        elif 'Category:' in line or 'Tag:' in line:
+            current['category'] = line.split(':', 1)[1].strip()
+    if 'title' in current:
+        stories.append(Story(**current))
+    return stories
+
+def count_streaming(path, outlet):
+    # Consume without keeping, as an archive job would
+    return sum(1 for _ in read_stories(path, outlet))
+
+def count_split(path, outlet):
+    return len(read_split(path, outlet))
+
+READERS = {'streaming': count_streaming, 'split': count_split}
+
+def measure(reader, path, outlet, repeat):
+    """(best seconds, stories, heap peak MB); the peak comes from one extra traced run"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        stories = reader(path, outlet)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    reader(path, outlet)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, stories, peak / 2 ** 20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated entries per file")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per reader; the fastest counts")
+    parser.add_argument('--readers', default=','.join(READERS), help="comma-separated subset of: " + ', '.join(READERS))
+    args = parser.parse_args()
+
+    outlet = load_registry().get('rt')
+    readers = {name: READERS[name] for name in args.readers.split(',')}
+    for size in (int(float(size)) for size in args.sizes.split(',')):
+        rows = [(title, outlet.id, prominence, time_, category)
+                for title, _, prominence, time_, category in corpus.generate(size)]
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = Path(work_dir) / f"{outlet.id}_stories.txt"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(corpus.stories_text(outlet, rows))
+            del rows
+            megabytes = path.stat().st_size / 2 ** 20
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = sum(1 for _ in f)
+            print(f"\n{size:,} entries: {lines:,} lines, {megabytes:.1f} MB")
+            for name, reader in readers.items():
+                seconds, stories, peak = measure(reader, str(path), outlet.name, args.repeat)
+                print(f"  {name:10s} {seconds:8.2f} s  {lines / seconds / 1000:8.0f} k lines/s  "
+                      f"{megabytes / seconds:6.1f} MB/s  {stories:>9,} stories  peak {peak:8.1f} MB")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
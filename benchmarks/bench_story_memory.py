@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare the memory held by story dicts and Story records
+Builds a month-sized history from the headlines in data/*_stories.txt, once as
+the dicts read_stories_file used to return and once as Story records, and
+reports the bytes allocated per story for each. Both layouts are measured
+the same way: tracemalloc over loading the rows from JSON and building the
+records, counting what is still alive afterwards.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outlets import load_registry  # noqa: E402
+from story import Story  # noqa: E402
+
+NUMBERED_RE = re.compile(r'^\s*\d+\. (.+)$', re.MULTILINE)
+PROMINENCES = ['top_story', 'featured', 'main', 'news_feed']
+CATEGORIES = ['', 'Политика', 'Экономика', 'Общество', 'СВО']
+
+def sample_rows(count, seed=1):
+    """JSON of count (title, outlet name, prominence, time, category) rows with unique titles"""
+    titles = []
+    for outlet in load_registry():
+        path = Path(outlet.stories_file)
+        if path.exists():
+            titles.extend(match.group(1) for match in NUMBERED_RE.finditer(path.read_text(encoding='utf-8')))
+    if not titles:
+        raise SystemExit("No stories in data/*_stories.txt")
+    outlets = [outlet.name for outlet in load_registry()]
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        rows.append((
+            f"{rng.choice(titles)} ({i})",
+            rng.choice(outlets),
+            rng.choice(PROMINENCES),
+            f"{rng.randrange(24):02d}:{rng.randrange(0, 60, 5):02d} Nov {rng.randrange(1, 31)}",
+            rng.choice(CATEGORIES),
+        ))
+    # Loaded back with json.loads, so every string is a separate object, as
+    # when history is loaded from disk
+    return json.dumps(rows, ensure_ascii=False)
+
+def build_dicts(rows):
+    return [{'title': title, 'source': source, 'prominence': prominence, 'time': time,
+             'category': category, 'topic': 'society', 'viral_score': 50, 'is_new': False}
+            for title, source, prominence, time, category in rows]
+
+def build_stories(rows):
+    stories = []
+    for title, source, prominence, time, category in rows:
+        story = Story(title, source, prominence, 'society', time=time, category=category)
+        story.viral_score = 50
+        story.is_new = False
+        stories.append(story)
+    return stories
+
+def measure(build, serialized):
+    """Bytes allocated by loading serialized and building records from it that are still alive afterwards"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(json.loads(serialized))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stories', type=int, default=100_000,
+                        help="history size (about a month of every outlet's homepage)")
+    args = parser.parse_args()
+
+    serialized = sample_rows(args.stories)
+    # Both layouts keep every loaded title; report them separately so the
+    # comparison also shows what the record layout itself costs
+    title_bytes = sum(sys.getsizeof(row[0]) for row in json.loads(serialized))
+
+    dict_bytes, dicts = measure(build_dicts, serialized)
+    del dicts
+    story_bytes, stories = measure(build_stories, serialized)
+    assert len(stories) == args.stories
+
+    print(f"{args.stories} stories, titles {title_bytes / args.stories:.0f} B/story in both layouts\n")
+    print(f"{'layout':8s} {'total MB':>9s} {'B/story':>8s} {'overhead B/story':>17s}")
+    for name, total in (('dict', dict_bytes), ('Story', story_bytes)):
+        overhead = total - title_bytes
+        print(f"{name:8s} {total / 2 ** 20:9.1f} {total / args.stories:8.0f} {overhead / args.stories:17.0f}")
+    print(f"\nStory records use {dict_bytes / story_bytes:.1f}x less memory "
+          f"({(dict_bytes - title_bytes) / (story_bytes - title_bytes):.1f}x less excluding title text)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
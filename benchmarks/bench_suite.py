@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite over synthetic corpora of 10^3 to 10^6 headlines
+Times the stories-file reader, the HTML extractors, cross-outlet clustering,
+topic and category classification, every viral scorer and the JSON emitters,
+writes the timings as JSON and compares them with a stored baseline.
+Every run of a case is bracketed by runs of a fixed calibration loop, and
+cases are compared by the median of their time relative to it, so a slower
+or busier machine (or one whose speed drifts mid-run) does not read as a
+regression; cases whose relative times spread widely get a correspondingly
+wider allowance. Exits non-zero if any case got slower than the baseline by
+more than that.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# analyze_stories builds its OpenAI client at import; no request is made here
+os.environ.setdefault('OPENAI_API_KEY', 'unused-by-benchmarks')
+
+import corpus  # noqa: E402
+from analyze_stories import calculate_viral_score, calculate_viral_scores, classify_topic, read_stories_file  # noqa: E402
+import collect_and_generate  # noqa: E402
+from collect_and_generate import find_cross_outlet_stories, generate_enhanced_story  # noqa: E402
+from generate_json import get_category  # noqa: E402
+from html_parsers import get_backend  # noqa: E402
+from outlets import extract_stories, load_registry  # noqa: E402
+from scoring import score_stories  # noqa: E402
+from static_output import publish_json, write_shard  # noqa: E402
+from story import Story  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BENCH_DIR / 'baseline.json'
+RESULTS_PATH = BENCH_DIR / 'results' / 'latest.json'
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Fractional slowdown per item, relative to the calibration loop, that counts
+# as a regression
+THRESHOLD = 0.25
+
+# Added to the threshold per unit of run-to-run spread ((max - min) / median)
+# of the noisier of the two measurements
+NOISE_FACTOR = 1
+
+# Cases whose baseline median is under this are dominated by scheduler and
+# cache noise and are not compared
+MIN_SECONDS = 0.05
+
+# Medians of fewer runs than this are too noisy to compare reliably
+MIN_COMPARE_REPEAT = 3
+
+
+# Per-item calls (one scorer call per story) and the emitters run on at most
+# this many items; their cost per item does not depend on the corpus size
+SAMPLE = 10_000
+EMIT_LIMIT = 100_000
+
+class Workload:
+    """Inputs derived once per corpus size and shared by the cases"""
+
+    def __init__(self, size, work_dir):
+        self.size = size
+        self.rows = corpus.generate(size)
+        self.titles = [row[0] for row in self.rows]
+        self.stories_files = corpus.write_stories_files(self.rows, Path(work_dir) / 'data')
+        self.pages = corpus.outlet_pages(self.rows)
+        self.work_dir = Path(work_dir)
+        self._records = None
+
+    def stories(self):
+        """Fresh Story records (scorers write to them)"""
+        return [Story(title, outlet, prominence, time=time, category=category)
+                for title, outlet, prominence, time, category in self.rows]
+
+    def clusters(self, count):
+        """Cross-outlet cluster dicts as the pipeline scores them"""
+        return [{'title': title, 'count': 2 + i % 5, 'outlets': [], 'prominence': prominence,
+                 'recency_hours': i % 48, 'momentum': i % 3 - 1}
+                for i, (title, _, prominence, _, _) in enumerate(self.rows[:count])]
+
+    def records(self):
+        """Published story records for the emitters"""
+        if self._records is None:
+            self._records = [generate_enhanced_story(rank, title, ['RT', 'TASS'], 100 - rank % 100)
+                             for rank, title in enumerate(self.titles[:EMIT_LIMIT], 1)]
+        return self._records
+
+def case_read_stories_file(work):
+    return sum(len(read_stories_file(str(path), outlet.name)) for outlet, path in work.stories_files.items())
+
+def case_extract_stories(work):
+    # Extraction stops at each outlet's scan_limit, as on a real homepage
+    return sum(len(extract_stories(outlet, html)) for outlet, html in work.pages)
+
+def case_find_cross_outlet_stories(work):
+    stories = work.stories()
+    with contextlib.redirect_stdout(io.StringIO()):
+        find_cross_outlet_stories(stories)
+    return len(stories)
+
+def case_classify_topic(work):
+    for title in work.titles:
+        classify_topic(title)
+    return len(work.titles)
+
+def case_get_category(work):
+    for title in work.titles:
+        get_category(title)
+    return len(work.titles)
+
+def case_calculate_viral_scores(work):
+    stories = work.stories()
+    calculate_viral_scores(stories)
+    return len(stories)
+
+def case_calculate_viral_score_homepage(work):
+    stories = work.stories()[:SAMPLE]
+    for story in stories:
+        calculate_viral_score(story)
+    return len(stories)
+
+def case_calculate_viral_score_cross_outlet(work):
+    clusters = work.clusters(SAMPLE)
+    for cluster in clusters:
+        collect_and_generate.calculate_viral_score(cluster)
+    return len(clusters)
+
+def case_score_cross_outlet(work):
+    clusters = work.clusters(work.size)
+    score_stories(clusters, 'cross_outlet')
+    return len(clusters)
+
+def case_score_curated(work):
+    # analyze_news.calculate_viral_score; that script runs on import, so its
+    # profile is timed directly
+    clusters = work.clusters(SAMPLE)
+    for cluster in clusters:
+        int(score_stories([cluster], 'curated')[0])
+    return len(clusters)
+
+def case_publish_json(work):
+    records = work.records()
+    path = work.work_dir / 'site' / 'viral_russia_news.json'
+    path.unlink(missing_ok=True)
+    publish_json(path, {'metadata': {'generated_at': datetime.now().isoformat()}, 'stories': records})
+    return len(records)
+
+def case_publish_json_unchanged(work):
+    records = work.records()
+    path = work.work_dir / 'site' / 'viral_russia_news.json'
+    if not path.exists():
+        publish_json(path, {'metadata': {}, 'stories': records})
+    publish_json(path, {'metadata': {'generated_at': datetime.now().isoformat()}, 'stories': records})
+    return len(records)
+
+def case_write_shard(work):
+    records = work.records()
+    for path in (work.work_dir / 'site' / 'shards').glob('top.*'):
+        path.unlink()
+    write_shard(work.work_dir / 'site', 'top', records)
+    return len(records)
+
+CASES = {name[len('case_'):]: function for name, function in globals().items() if name.startswith('case_')}
+
+def calibration_loop():
+    # Fixed interpreter-bound work of the kind the cases do: string splitting,
+    # dict counting, sorting and JSON encoding
+    counts = {}
+    for i in range(20_000):
+        for word in f"слово{i % 997} новость{i % 89}".split():
+            counts[word] = counts.get(word, 0) + 1
+    return len(json.dumps(sorted(counts.items()), ensure_ascii=False))
+
+def calibrate():
+    """Wall seconds of one run of the calibration loop"""
+    started = time.perf_counter()
+    calibration_loop()
+    return time.perf_counter() - started
+
+def run_case(function, work, repeat, calibration):
+    """(median wall seconds, median relative time, spread, items) over repeat runs
+
+    Each run's relative time is its wall time over the mean of the calibration
+    loops timed just before and just after it; those timings are appended to
+    calibration. spread is (largest - smallest) / median of the relative
+    times, 0 for a single run.
+    """
+    timings = []
+    relative = []
+    before = calibrate()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        items = function(work)
+        elapsed = time.perf_counter() - started
+        after = calibrate()
+        timings.append(elapsed)
+        relative.append(elapsed / ((before + after) / 2))
+        calibration.append(before)
+        before = after
+    calibration.append(before)
+    median = statistics.median(relative)
+    return statistics.median(timings), median, (max(relative) - min(relative)) / median, items
+
+def compare(results, baseline, threshold):
+    """[(key, ratio, allowed)] of cases slower per item than the baseline by more than allowed
+
+    Cases are compared by time per item relative to the calibration loop, not
+    by wall time. allowed is threshold widened by NOISE_FACTOR times the
+    larger run-to-run spread of the two measurements.
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if not reference or 'relative' not in reference or reference['seconds'] < MIN_SECONDS:
+            continue
+        ratio = (result['relative'] / max(result['items'], 1)) / (reference['relative'] / max(reference['items'], 1))
+        allowed = 1 + threshold + NOISE_FACTOR * max(result.get('spread', 0), reference.get('spread', 0))
+        if ratio > allowed:
+            regressions.append((key, ratio, allowed))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated corpus sizes (up to 1000000)")
+    parser.add_argument('--cases', help="comma-separated subset of: " + ', '.join(CASES))
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="runs per case; the median counts (with fewer than 3, scheduler "
+                             "noise alone can exceed the threshold)")
+    parser.add_argument('--output', type=Path, default=RESULTS_PATH, help="results JSON to write")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="allowed slowdown per item, relative to the calibration loop, "
+                             "before failing (0.25 = 25%%)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="store these results as the new baseline")
+    args = parser.parse_args()
+
+    sizes = [int(float(size)) for size in args.sizes.split(',')]
+    cases = {name: CASES[name] for name in args.cases.split(',')} if args.cases else CASES
+
+    calibration = []
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as work_dir:
+            started = time.perf_counter()
+            work = Workload(size, work_dir)
+            print(f"\n{size:,} headlines (corpus built in {time.perf_counter() - started:.1f}s)")
+            for name, function in cases.items():
+                seconds, relative, spread, items = run_case(function, work, args.repeat, calibration)
+                results[f"{name}/{size}"] = {
+                    'case': name, 'size': size, 'items': items,
+                    'seconds': round(seconds, 6), 'us_per_item': round(seconds / max(items, 1) * 1e6, 3),
+                    'relative': round(relative, 6), 'spread': round(spread, 3),
+                }
+                print(f"  {name:38s} {seconds * 1000:10.1f} ms  {seconds / max(items, 1) * 1e6:9.2f} us/item"
+                      f"  ±{spread / 2:.0%}")
+    calibration_seconds = statistics.median(calibration)
+    print(f"\nCalibration loop {calibration_seconds * 1000:.1f} ms (median of {len(calibration)})")
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parser_backend': get_backend().name,
+            'outlets': len(load_registry()),
+            'repeat': args.repeat,
+            'calibration_seconds': round(calibration_seconds, 6),
+        },
+        'results': results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    print(f"Wrote {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+        print(f"Stored baseline {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline} (run with --update-baseline)")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    if args.repeat < MIN_COMPARE_REPEAT:
+        print(f"Warning: --repeat {args.repeat} is too noisy to compare reliably; use {MIN_COMPARE_REPEAT} or more")
+    if 'calibration_seconds' not in baseline['meta']:
+        print("Warning: the baseline predates calibrated timings; re-record it with --update-baseline")
+    regressions = compare(results, baseline['results'], args.threshold)
+    print(f"Compared with baseline from {baseline['meta']['created_at']} "
+          f"({baseline['meta']['platform']}) relative to the calibration loop, threshold "
+          f"{args.threshold:.0%}; cases under {MIN_SECONDS * 1000:.0f} ms not compared")
+    for key, ratio, allowed in regressions:
+        print(f"  REGRESSION {key}: {ratio:.2f}x slower per item (allowed {allowed:.2f}x)")
+    if not regressions:
+        print("  No regressions")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled keyword taxonomy against per-list substring scans
+Builds a synthetic headline corpus from the taxonomy keywords plus filler
+words, checks that both classifiers agree and reports headlines per second
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from taxonomy import TAXONOMY, Classification, classify  # noqa: E402
+
+FILLER = ('заявил сообщил в на по итогам встречи глава региона суд москва жители области '
+          'новый закон вступил силу рассказал эксперт утром вечером произошло стало известно').split()
+
+def classify_naive(title):
+    """Reference: one any(kw in title) scan per keyword list, as the scripts used to do"""
+    title_lower = title.lower()
+    labels = {}
+    for dimension, spec in TAXONOMY.items():
+        matches = [label for label, keywords in spec['rules']
+                   if any(kw in title_lower for kw in keywords)]
+        if spec.get('multi'):
+            labels[dimension] = tuple(matches)
+        else:
+            labels[dimension] = matches[0] if matches else spec['default']
+    return Classification(**labels)
+
+def synthetic_headlines(count, seed=0):
+    """Headlines of 6-12 words, about half of them containing taxonomy keywords"""
+    rng = random.Random(seed)
+    keywords = sorted({kw for spec in TAXONOMY.values() for _, kws in spec['rules'] for kw in kws})
+    headlines = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(6, 12))
+        for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords) + rng.choice(['', 'а', 'ии', 'ом']))
+        headlines.append(' '.join(words).capitalize())
+    return headlines
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=200_000)
+    args = parser.parse_args()
+
+    headlines = synthetic_headlines(args.count)
+    classify(headlines[0])  # Compile outside the timed loop
+
+    timings = {}
+    results = {}
+    for name, classifier in (('naive', classify_naive), ('compiled', classify)):
+        started = time.perf_counter()
+        results[name] = [classifier(title) for title in headlines]
+        timings[name] = time.perf_counter() - started
+        print(f"{name:9s} {args.count / timings[name]:12,.0f} headlines/s")
+
+    print(f"speedup   {timings['naive'] / timings['compiled']:.2f}x")
+    if results['naive'] != results['compiled']:
+        print("MISMATCH between naive and compiled classification")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Check that headline clusters never chain unrelated headlines together
+Clusters synthetic corpora with dedup.cluster_titles and verifies that every
+pair of headlines inside each cluster meets the similarity threshold.
+Exits non-zero on the first corpus with a pair below it.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import corpus  # noqa: E402
+from dedup import SIMILARITY_THRESHOLD, cluster_titles, jaccard, shingles  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 20_000]
+
+def weakest_pair(result, shingle_sets):
+    """(similarity, i, j) of the least similar pair inside any cluster; None if all are singletons"""
+    weakest = None
+    for members in result.clusters:
+        for position, i in enumerate(members):
+            for j in members[position + 1:]:
+                similarity = jaccard(shingle_sets[i], shingle_sets[j])
+                if weakest is None or similarity < weakest[0]:
+                    weakest = (similarity, i, j)
+    return weakest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated corpus sizes")
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument('--mode', choices=['word', 'char'], default='word')
+    args = parser.parse_args()
+
+    failures = 0
+    for size in (int(float(size)) for size in args.sizes.split(',')):
+        titles = [row[0] for row in corpus.generate(size)]
+        result = cluster_titles(titles, threshold=args.threshold, mode=args.mode)
+        weakest = weakest_pair(result, [shingles(title, args.mode) for title in titles])
+        largest = max(map(len, result.clusters))
+        print(f"{size:,} headlines: {len(result.clusters):,} clusters, largest {largest}")
+        if weakest is not None and weakest[0] < args.threshold:
+            similarity, i, j = weakest
+            print(f"  FAIL: pair below {args.threshold} ({similarity:.2f}) in one cluster:\n"
+                  f"    {titles[i]}\n    {titles[j]}")
+            failures += 1
+        else:
+            print(f"  OK: weakest pair in a cluster {weakest[0] if weakest else 1.0:.2f}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Check that re-running LLM enrichment on unchanged input makes no API requests
+Starts a local OpenAI-compatible stub server, enriches the same headlines
+twice in a fresh working directory (with an empty translation memory each
+time, so only the completion cache can answer) and counts the requests the
+stub received. Exits non-zero if the second run made any, or if its output
+differs from the first.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+HEADLINES = [
+    "Путин провел совещание с членами Совбеза",
+    "ЦБ сохранил ключевую ставку на уровне 16,5%",
+    "В Москве открылась выставка к юбилею Третьяковской галереи",
+    "МИД России ответил на новые санкции Евросоюза",
+]
+
+class StubOpenAI:
+    """Local /v1/chat/completions endpoint that answers every request and counts them
+
+    Structured requests get every field of their JSON schema; others get a
+    short text derived from the last message.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _answer(self, body):
+        response_format = body.get('response_format')
+        last = body['messages'][-1]['content']
+        if response_format:
+            fields = response_format['json_schema']['schema']['properties']
+            return json.dumps({field: f"{field}: {last[:40]}" for field in fields}, ensure_ascii=False)
+        return f"stub: {last[:40]}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub._lock:
+                    stub.requests += 1
+                payload = json.dumps({
+                    'id': f"stub-{stub.requests}", 'object': 'chat.completion', 'created': 0,
+                    'model': body['model'],
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': stub._answer(body)}}],
+                    'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15},
+                }, ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+def enrich_once(mode, memory_path):
+    """Enriched fields of HEADLINES, enriched with an empty translation memory"""
+    from analyze_stories import calculate_viral_scores, enhance_stories_with_ai
+    from story import Story
+    from translation_memory import TranslationMemory
+
+    stories = [Story(title, 'rt', 'main') for title in HEADLINES]
+    calculate_viral_scores(stories)
+    with contextlib.redirect_stdout(io.StringIO()):
+        enhance_stories_with_ai(stories, mode=mode, memory=TranslationMemory(memory_path))
+    return [story.to_dict() for story in stories]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', default='structured,per-field',
+                        help="comma-separated enrichment modes to check")
+    args = parser.parse_args()
+
+    stub = StubOpenAI().start()
+    # analyze_stories builds its client at import, from these
+    os.environ['OPENAI_BASE_URL'] = stub.base_url
+    os.environ.setdefault('OPENAI_API_KEY', 'unused-by-stub')
+
+    failures = 0
+    previous_dir = os.getcwd()
+    try:
+        for mode in args.modes.split(','):
+            with tempfile.TemporaryDirectory() as work_dir:
+                # The completion cache lives under .cache/ in the working directory
+                os.chdir(work_dir)
+                try:
+                    counts = []
+                    outputs = []
+                    for run in (1, 2):
+                        before = stub.requests
+                        outputs.append(enrich_once(mode, Path(work_dir) / f"memory-{run}.sqlite3"))
+                        counts.append(stub.requests - before)
+                finally:
+                    os.chdir(previous_dir)
+            ok = counts[0] > 0 and counts[1] == 0 and outputs[0] == outputs[1]
+            failures += not ok
+            print(f"{mode:10s} first run {counts[0]:3d} requests, second run {counts[1]:3d} "
+                  f"{'OK' if ok else 'FAIL'}")
+    finally:
+        stub.stop()
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Synthetic Russian headline corpora for the benchmarks
+Headlines are built from news-style templates (agency, verb, subject, tail,
+numbers) and grouped into events that several outlets cover with slightly
+different wording, so clustering sees realistic near-duplicates. Corpora can
+be written in the data/*_stories.txt format or as outlet homepages that the
+registry's selectors scrape.
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outlets import load_registry  # noqa: E402
+
+# (agent, verb ending for its gender/number)
+AGENTS = [
+    ('Путин', ''), ('Песков', ''), ('Лавров', ''), ('Мишустин', ''), ('Захарова', 'а'),
+    ('Собянин', ''), ('Набиуллина', 'а'), ('Силуанов', ''), ('Минобороны', 'о'), ('МИД России', ''),
+    ('Госдума', 'а'), ('Совфед', ''), ('ЦБ', ''), ('Минфин', ''), ('Роскомнадзор', ''), ('СК', ''),
+    ('Суд Москвы', ''), ('Генпрокуратура', 'а'), ('ФСБ', 'а'), ('МЧС', 'и'), ('Росстат', ''),
+    ('Минздрав', ''), ('Зеленский', ''), ('Трамп', ''), ('Пентагон', ''), ('Еврокомиссия', 'а'),
+    ('НАТО', 'о'), ('Макрон', ''), ('Мерц', ''), ('Эрдоган', ''), ('Си Цзиньпин', ''), ('ВСУ', 'и'),
+]
+# Past-tense stems; every phrase takes a prepositional-case subject
+VERBS = [
+    'заявил{} о', 'рассказал{} о', 'сообщил{} о', 'предупредил{} о', 'напомнил{} о', 'доложил{} о',
+    'прокомментировал{} сообщения о', 'прокомментировал{} слухи о', 'ответил{} на вопрос о',
+    'раскрыл{} детали соглашения о', 'назвал{} сроки решения о', 'потребовал{} данные о',
+]
+SUBJECTS = [
+    'переговорах с США', 'ключевой ставке', 'поставках оружия Киеву', 'новых санкциях',
+    'росте цен на бензин', 'ситуации в Красноармейске', 'повышении пенсий', 'блокировке сим-карт',
+    'отключении горячей воды', 'выборах в Госдуму', 'курсе рубля', 'ударах по энергетике',
+    'обмене пленными', 'ипотеке для семей', 'налоге на прибыль', 'мобилизации', 'урожае зерна',
+    'ценах на жильё', 'запрете мессенджеров', 'перекрытии Крымского моста', 'нефтяном потолке',
+    'миграционной политике', 'заморозке активов', 'зарплатах бюджетников', 'вакцинации от гриппа',
+    'аварии на МКАД', 'пожаре в Подмосковье', 'задержании топ-менеджера', 'взыскании долгов без суда',
+    'отмене рейсов в Шереметьево', 'цифровом рубле', 'утильсборе на автомобили', 'экзаменах в 2026 году',
+]
+TAILS = [
+    '', '', '', 'в ноябре', 'на этой неделе', 'после встречи в Женеве', 'на фоне протестов',
+    'в Подмосковье', 'в Петербурге', 'до конца года', 'в ближайшие дни', 'по итогам заседания',
+]
+QUOTES = [
+    '«Это вопрос времени»', '«Может стать информационной бомбой»', '«Ситуация под контролем»',
+    '«Мы к этому готовы»', '«Никаких договорённостей нет»', '«Цены продолжат расти»',
+]
+NUMBER_PHRASES = ['на {n}%', 'в {n} раз', '{n} человек', 'до {n} тыс. рублей', 'на {n} млрд руб']
+
+PROMINENCES = ['top_story', 'featured', 'main', 'news_feed']
+CATEGORIES = ['', '', 'Политика', 'Экономика', 'Общество', 'СВО', 'Мир', 'Происшествия']
+
+def event_headline(rng):
+    """One news event as (agent, verb, subject, tail, number phrase, quote)"""
+    number = rng.choice(NUMBER_PHRASES).format(n=rng.randrange(2, 900)) if rng.random() < 0.3 else ''
+    quote = rng.choice(QUOTES) if rng.random() < 0.15 else ''
+    return (rng.choice(AGENTS), rng.choice(VERBS), rng.choice(SUBJECTS), rng.choice(TAILS), number, quote)
+
+def render(event, rng, reword=False):
+    """Headline text for an event; reword gives another outlet's phrasing of it"""
+    (agent, ending), verb, subject, tail, number, quote = event
+    if reword:
+        choice = rng.randrange(4)
+        if choice == 0:
+            verb = rng.choice(VERBS)
+        elif choice == 1:
+            tail = ''
+        elif choice == 2:
+            quote = ''
+        else:
+            tail = rng.choice(TAILS)
+    verb = verb.format(ending)
+    if subject[0] in 'аоуэи':
+        verb += 'б'  # 'об ударах', 'об обмене'
+    words = [agent, verb, subject, number, tail]
+    title = ' '.join(word for word in words if word)
+    if quote:
+        title = f"{quote}: {title}"
+    return title
+
+def generate(count, seed=0, coverage=(1, 4)):
+    """count headline rows (title, outlet id, prominence, time, category)
+
+    Each event is covered by a random number of outlets in the coverage range,
+    each with its own wording. Repeated texts get a different figure appended
+    so that every headline is unique, as in a real archive.
+    """
+    rng = random.Random(seed)
+    outlet_ids = [outlet.id for outlet in load_registry()]
+    rows = []
+    seen = set()
+    while len(rows) < count:
+        event = event_headline(rng)
+        outlets = rng.sample(outlet_ids, min(len(outlet_ids), rng.randint(*coverage)))
+        for position, outlet in enumerate(outlets):
+            title = render(event, rng, reword=position > 0)
+            while title in seen:
+                title = f"{title}, {rng.choice(NUMBER_PHRASES).format(n=rng.randrange(2, 10_000))}"
+            seen.add(title)
+            rows.append((
+                title, outlet, rng.choice(PROMINENCES),
+                f"{rng.randrange(24):02d}:{rng.randrange(0, 60, 5):02d} Nov {rng.randrange(1, 31)}",
+                rng.choice(CATEGORIES),
+            ))
+            if len(rows) == count:
+                break
+    return rows
+
+# Section headers cycled through a stories file, and whether their entries are bullets
+SECTIONS = [
+    ('ГЛАВНОЕ (Main Stories):', False),
+    ('FEATURED ARTICLES:', False),
+    ('NEWS FEED (Recent):', True),
+]
+
+def stories_text(outlet, rows, section_size=50):
+    """An outlet's rows in the data/*_stories.txt layout
+
+    The first row is the 'TOP STORY:' Title: block; the rest are split into
+    sections of numbered or bulleted entries.
+    """
+    lines = [f"{outlet.name} - Featured Stories (Nov 1, 2025)", '']
+    for i, (title, _, prominence, time, category) in enumerate(rows):
+        indent = '   '
+        if i == 0:
+            lines += ['TOP STORY:', f"Title: {title}"]
+            indent = ''
+        else:
+            position = (i - 1) % section_size
+            header, bulleted = SECTIONS[(i - 1) // section_size % len(SECTIONS)]
+            if position == 0:
+                lines.append(header)
+            lines.append(f"- {title}" if bulleted else f"{position + 1}. {title}")
+            if bulleted:
+                indent = '  '
+        lines.append(f"{indent}Time: {time}")
+        lines.append(f"{indent}Prominence: {prominence}")
+        if category:
+            lines.append(f"{indent}Category: {category}")
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+def write_stories_files(rows, out_dir):
+    """Write <out_dir>/<outlet>_stories.txt for every outlet; returns {outlet: path}"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for outlet in load_registry():
+        path = out_dir / f"{outlet.id}_stories.txt"
+        path.write_text(stories_text(outlet, [row for row in rows if row[1] == outlet.id]), encoding='utf-8')
+        paths[outlet] = path
+    return paths
+
+def outlet_page(outlet, titles, rng):
+    """Homepage HTML whose containers match the outlet's selectors, with some noise around them"""
+    tag = outlet.container_tags[0]
+    parts = ['<html><head><title>Главное</title><script>window.__data = {};</script></head><body>',
+             '<nav><a href="/">Главная</a><a href="/politics">Политика</a></nav>']
+    for i, title in enumerate(titles):
+        classes = ' '.join(filter(None, [rng.choice(outlet.container_classes or ['item']),
+                                         'main' if i < 2 else '']))
+        if rng.random() < 0.1:
+            # Inline tracking code inside the headline markup, as some outlets have
+            title = f"<script>track({i});</script>{title}<style>.n{i}{{color:red}}</style>"
+        inner = f"<{outlet.title_tags[0]}>{title}</{outlet.title_tags[0]}>" if outlet.title_tags else title
+        parts.append(f'<{tag} class="{classes}" href="/news/{i}">{inner}</{tag}>')
+        if rng.random() < 0.3:
+            parts.append('<div class="banner"><span>Реклама</span></div>')
+    parts.append('<footer>© 2025</footer></body></html>')
+    return '\n'.join(parts)
+
+def outlet_pages(rows, per_page=50, seed=0):
+    """[(outlet, html)]: every outlet's rows split into homepages of per_page headlines"""
+    rng = random.Random(seed)
+    pages = []
+    for outlet in load_registry():
+        titles = [row[0] for row in rows if row[1] == outlet.id]
+        for start in range(0, len(titles), per_page):
+            pages.append((outlet, outlet_page(outlet, titles[start:start + per_page], rng)))
+    return pages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=10_000, help="headlines to generate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', type=Path, default=Path('benchmarks/corpus'),
+                        help="directory for the stories files and pages/")
+    parser.add_argument('--pages', action='store_true', help="also write outlet homepages")
+    args = parser.parse_args()
+
+    rows = generate(args.count, args.seed)
+    paths = write_stories_files(rows, args.out)
+    print(f"Wrote {args.count} headlines to {len(paths)} stories files in {args.out}")
+    if args.pages:
+        pages_dir = args.out / 'pages'
+        pages_dir.mkdir(parents=True, exist_ok=True)
+        pages = outlet_pages(rows, seed=args.seed)
+        for i, (outlet, html) in enumerate(pages):
+            (pages_dir / f"{outlet.id}-{i:06d}.html").write_text(html, encoding='utf-8')
+        print(f"Wrote {len(pages)} homepages to {pages_dir}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
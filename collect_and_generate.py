@@ -1,229 +1,215 @@
 #!/usr/bin/env python3
 """
 Automated Viral Russia News Collection Script
-Collects news from 6 major Russian outlets, analyzes viral potential, and generates JSON
+Collects news from the outlets in outlets.json, analyzes viral potential, and generates JSON
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 from datetime import datetime, timedelta
-from collections import defaultdict
 import time
 import random
+from http_cache import HTTPCache
+from transport import TRANSPORT
+from outlets import load_registry, extract_stories
+from feeds import extract_feed_stories
+from dedup import cluster_titles, SIMILARITY_THRESHOLD
+from scoring import score_stories
+from taxonomy import classify
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
 
 # User agent to avoid blocking
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 }
 
-def fetch_page(url, max_retries=3):
-    """Fetch a webpage with retries"""
+# Minimum delay between two requests to the same host (seconds)
+POLITENESS_DELAY = 1.0
+
+class HostThrottle:
+    """Enforce a minimum delay between requests to the same host"""
+
+    def __init__(self, delay=POLITENESS_DELAY):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        """Block until the host of url may be contacted again"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+THROTTLE = HostThrottle()
+
+# Shared conditional-request cache; set to None to always hit the network
+HTTP_CACHE = HTTPCache()
+
+def fetch_page(url, max_retries=3, throttle=THROTTLE):
+    """Fetch a webpage with retries, revalidating against the HTTP cache
+
+    A cached body that can no longer be read (e.g. evicted by another run)
+    is fetched again in full.
+    """
+    cache = HTTP_CACHE
+    entry = cache.lookup(url) if cache else None
+    if entry and cache.is_fresh(url, entry):
+        try:
+            body, encoding = cache.read(url, entry)
+            return body.decode(encoding or 'utf-8', errors='replace')
+        except OSError as e:
+            print(f"Cached copy of {url} unreadable ({e}); fetching it again")
+            entry = None
+
+    headers = dict(HEADERS)
+    if cache:
+        headers.update(cache.conditional_headers(entry))
+
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, headers=HEADERS, timeout=15)
-            response.raise_for_status()
-            return response.text
+            if throttle is not None:
+                throttle.wait(url)
+            result = TRANSPORT.get(url, headers=headers, timeout=15)
+            if result.status == 304 and entry:
+                try:
+                    body, encoding = cache.read(url, entry, revalidated=True)
+                    return body.decode(encoding or 'utf-8', errors='replace')
+                except OSError as e:
+                    # Not a failed attempt: ask again without the validators
+                    print(f"Cached copy of {url} unreadable after 304 ({e}); fetching it again")
+                    entry = None
+                    headers = dict(HEADERS)
+                    if throttle is not None:
+                        throttle.wait(url)
+                    result = TRANSPORT.get(url, headers=headers, timeout=15)
+            if result.metrics.truncated:
+                # Headlines sit near the top, so the prefix is still usable, but
+                # caching it would have later 304s serve the cut-off page
+                print(f"Warning: {url} exceeded {TRANSPORT.max_body_bytes} bytes; "
+                      f"using the truncated page without caching it")
+            elif cache:
+                cache.store(url, result.body, result.encoding, result.headers)
+            return result.text
         except Exception as e:
             print(f"Attempt {attempt + 1} failed for {url}: {e}")
             if attempt < max_retries - 1:
                 time.sleep(2 ** attempt)  # Exponential backoff
     return None
 
-def extract_rt_news():
-    """Extract news from RT Russian"""
-    print("Collecting from RT Russian...")
-    html = fetch_page("https://russian.rt.com/")
+def extract_outlet_news(outlet, url=None):
+    """Extract news from one registry outlet"""
+    print(f"Collecting from {outlet.name}...")
+    html = fetch_page(url or outlet.url)
     if not html:
         return []
-    
-    soup = BeautifulSoup(html, 'html.parser')
-    stories = []
-    
-    # Extract main headlines
-    for article in soup.find_all(['article', 'div'], class_=['card', 'article', 'news-item'], limit=15):
-        title_elem = article.find(['h2', 'h3', 'a'])
-        if title_elem:
-            title = title_elem.get_text(strip=True)
-            if len(title) > 20:  # Filter out short/invalid titles
-                stories.append({
-                    'title': title,
-                    'outlet': 'RT',
-                    'prominence': 'FEATURED' if 'main' in str(article.get('class', [])).lower() else 'NEWS_FEED'
-                })
-    
-    return stories[:10]
+    return extract_stories(outlet, html)
 
-def extract_tass_news():
-    """Extract news from TASS"""
-    print("Collecting from TASS...")
-    html = fetch_page("https://tass.ru/")
-    if not html:
-        return []
-    
-    soup = BeautifulSoup(html, 'html.parser')
-    stories = []
-    
-    for article in soup.find_all(['a', 'div'], class_=['Link', 'news', 'tass'], limit=15):
-        title = article.get_text(strip=True)
-        if len(title) > 20:
-            stories.append({
-                'title': title,
-                'outlet': 'TASS',
-                'prominence': 'TOP_STORY' if 'main' in str(article.get('class', [])).lower() else 'NEWS_FEED'
-            })
-    
-    return stories[:10]
-
-def extract_ria_news():
-    """Extract news from RIA Novosti"""
-    print("Collecting from RIA Novosti...")
-    html = fetch_page("https://ria.ru/")
-    if not html:
-        return []
-    
-    soup = BeautifulSoup(html, 'html.parser')
-    stories = []
-    
-    for article in soup.find_all(['a', 'div'], class_=['cell-list__item', 'list-item'], limit=15):
-        title = article.get_text(strip=True)
-        if len(title) > 20:
-            stories.append({
-                'title': title,
-                'outlet': 'RIA',
-                'prominence': 'FEATURED'
-            })
-    
-    return stories[:10]
-
-def extract_rg_news():
-    """Extract news from Rossiyskaya Gazeta"""
-    print("Collecting from Rossiyskaya Gazeta...")
-    html = fetch_page("https://rg.ru/")
-    if not html:
-        return []
-    
-    soup = BeautifulSoup(html, 'html.parser')
-    stories = []
-    
-    for article in soup.find_all(['a', 'div'], class_=['b-material', 'news'], limit=15):
-        title = article.get_text(strip=True)
-        if len(title) > 20:
-            stories.append({
-                'title': title,
-                'outlet': 'RG',
-                'prominence': 'MAIN'
-            })
-    
-    return stories[:10]
+def extract_outlet_feed(outlet, url=None, max_retries=3, throttle=THROTTLE):
+    """Extract news from an outlet's RSS/Atom feed or news sitemap"""
+    url = url or outlet.feed_url
+    print(f"Collecting feed from {outlet.name}...")
+    for attempt in range(max_retries):
+        try:
+            if throttle is not None:
+                throttle.wait(url)
+            return extract_feed_stories(outlet, TRANSPORT.stream(url, headers=HEADERS))
+        except Exception as e:
+            print(f"Attempt {attempt + 1} failed for {url}: {e}")
+            if attempt < max_retries - 1:
+                time.sleep(2 ** attempt)
+    return []
+
+def outlet_extractors(registry=None, collector=None):
+    """One extractor callable per registry outlet
+
+    collector forces 'html' or 'feed' for every outlet; by default each
+    outlet's own setting is used (outlets without a feed_url always scrape HTML).
+    """
+    registry = registry or load_registry()
+    extractors = []
+    for outlet in registry:
+        mode = collector or outlet.collector
+        if mode == 'feed' and outlet.feed_url:
+            extractors.append(partial(extract_outlet_feed, outlet))
+        else:
+            extractors.append(partial(extract_outlet_news, outlet))
+    return extractors
+
+def collect_all(extractors=None, concurrent=True, max_workers=None, collector=None):
+    """Run all outlet extractors and return their stories in extractor order
+
+    In concurrent mode every outlet is fetched in parallel; politeness is kept
+    per host by fetch_page's throttle, so wall-clock time is close to the
+    slowest host's (its latency plus the delays between its requests) instead
+    of the sum of all of them (checked by benchmarks/bench_collect.py).
+    """
+    if extractors is None:
+        extractors = outlet_extractors(collector=collector)
+
+    def run(extractor):
+        try:
+            return extractor()
+        except Exception as e:
+            print(f"Extractor {getattr(extractor, 'args', extractor)} failed: {e}")
+            return []
 
-def extract_kp_news():
-    """Extract news from Komsomolskaya Pravda"""
-    print("Collecting from Komsomolskaya Pravda...")
-    html = fetch_page("https://www.kp.ru/")
-    if not html:
-        return []
-    
-    soup = BeautifulSoup(html, 'html.parser')
-    stories = []
-    
-    for article in soup.find_all(['a', 'div'], class_=['styled', 'news'], limit=15):
-        title = article.get_text(strip=True)
-        if len(title) > 20:
-            stories.append({
-                'title': title,
-                'outlet': 'KP',
-                'prominence': 'NEWS_FEED'
-            })
-    
-    return stories[:10]
+    if not concurrent:
+        results = [run(extractor) for extractor in extractors]
+    else:
+        workers = max_workers or max(1, len(extractors))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, extractors))
 
-def extract_lenta_news():
-    """Extract news from Lenta.ru"""
-    print("Collecting from Lenta.ru...")
-    html = fetch_page("https://lenta.ru/")
-    if not html:
-        return []
-    
-    soup = BeautifulSoup(html, 'html.parser')
-    stories = []
-    
-    for article in soup.find_all(['a', 'div'], class_=['card', 'item'], limit=15):
-        title = article.get_text(strip=True)
-        if len(title) > 20:
-            stories.append({
-                'title': title,
-                'outlet': 'Lenta',
-                'prominence': 'FEATURED'
-            })
-    
-    return stories[:10]
+    all_stories = []
+    for stories in results:
+        all_stories.extend(stories)
+    return all_stories
 
 def normalize_title(title):
     """Normalize title for comparison"""
     # Remove extra whitespace, convert to lowercase
     return ' '.join(title.lower().split())
 
-def find_cross_outlet_stories(all_stories):
+def find_cross_outlet_stories(all_stories, threshold=SIMILARITY_THRESHOLD):
     """Find stories that appear across multiple outlets"""
-    # Group similar stories
-    story_groups = defaultdict(list)
-    
-    for story in all_stories:
-        normalized = normalize_title(story['title'])
-        # Use first 50 characters as key for grouping
-        key = normalized[:50]
-        story_groups[key].append(story)
+    # Group near-duplicate headlines (paraphrases included) with MinHash LSH
+    result = cluster_titles([story['title'] for story in all_stories], threshold=threshold)
+    print(f"Clustering: {result}")
     
     # Find stories with cross-outlet coverage
     cross_outlet_stories = []
-    for key, group in story_groups.items():
+    for members in result.clusters:
+        group = [all_stories[index] for index in members]
         if len(group) >= 2:  # At least 2 outlets
-            outlets = list(set([s['outlet'] for s in group]))
+            outlets = list(dict.fromkeys(s['outlet'] for s in group))
+            published = [datetime.fromisoformat(s['published']).timestamp() for s in group if s.get('published')]
             cross_outlet_stories.append({
                 'title': group[0]['title'],
                 'outlets': outlets,
                 'count': len(outlets),
-                'prominence': group[0]['prominence']
+                'prominence': group[0]['prominence'],
+                'members': [{'title': s['title'], 'outlet': s['outlet']} for s in group],
+                'indices': members,
+                'published_at': min(published, default=None)
             })
     
     return cross_outlet_stories
 
 def calculate_viral_score(story):
     """Calculate viral score based on cross-outlet coverage"""
-    score = 0
-    
-    # Cross-outlet coverage (0-70 points)
-    score += min(story['count'] * 12, 70)
-    
-    # Prominence bonus (0-20 points)
-    prominence_map = {
-        'TOP_STORY': 20,
-        'FEATURED': 15,
-        'MAIN': 12,
-        'NEWS_FEED': 8
-    }
-    score += prominence_map.get(story['prominence'], 5)
-    
-    # Recency bonus (0-10 points) - assume all are recent
-    score += 10
-    
-    return min(int(score), 100)
+    # Coverage (0-70), prominence (0-20), age (0-10, decaying) and momentum
+    # (-15..15) points, capped at 100: the 'cross_outlet' profile in scoring.json
+    return int(score_stories([story], 'cross_outlet')[0])
 
 def generate_enhanced_story(rank, title, outlets, viral_score):
     """Generate enhanced story data with all required fields"""
     # Determine topic based on keywords
-    title_lower = title.lower()
-    if any(word in title_lower for word in ['взрыв', 'погиб', 'авария', 'пожар', 'explosion', 'accident']):
-        topic = 'Emergency'
-    elif any(word in title_lower for word in ['путин', 'трамп', 'политик', 'putin', 'trump', 'politics']):
-        topic = 'Politics'
-    elif any(word in title_lower for word in ['армия', 'военн', 'дрон', 'military', 'army', 'drone']):
-        topic = 'Military'
-    elif any(word in title_lower for word in ['эконом', 'санкц', 'economy', 'sanctions']):
-        topic = 'Economy'
-    else:
-        topic = 'Society'
+    topic = classify(title).news_topic
     
     # Estimate VK engagement based on viral score
     if viral_score >= 80:
@@ -247,102 +233,19 @@ def generate_enhanced_story(rank, title, outlets, viral_score):
         'prominence': 'TOP_STORY' if viral_score >= 80 else 'FEATURED',
         'summary': f"This story about '{title}' is trending across {len(outlets)} major Russian news outlets.",
         'summary_ru': f"Эта история о '{title}' в тренде в {len(outlets)} крупных российских новостных изданиях.",
-        'why_trending': f"This story is trending because it appears across {len(outlets)} major outlets with a viral score of {viral_score}/100.",
-        'why_trending_ru': f"Эта история в тренде, потому что появляется в {len(outlets)} крупных изданиях с вирусным рейтингом {viral_score}/100.",
-        'source_urls': [
-            f"https://russian.rt.com/" if 'RT' in outlets else None,
-            f"https://tass.ru/" if 'TASS' in outlets else None,
-            f"https://ria.ru/" if 'RIA' in outlets else None,
-            f"https://rg.ru/" if 'RG' in outlets else None,
-            f"https://www.kp.ru/" if 'KP' in outlets else None,
-            f"https://lenta.ru/" if 'Lenta' in outlets else None
-        ],
-        'source_urls': [url for url in [
-            "https://russian.rt.com/" if 'RT' in outlets else None,
-            "https://tass.ru/" if 'TASS' in outlets else None,
-            "https://ria.ru/" if 'RIA' in outlets else None,
-            "https://rg.ru/" if 'RG' in outlets else None,
-            "https://www.kp.ru/" if 'KP' in outlets else None,
-            "https://lenta.ru/" if 'Lenta' in outlets else None
-        ] if url],
+        # The score is published next to these and changes as the story ages;
+        # quoting it would make every run's text differ
+        'why_trending': f"This story is trending because it appears across {len(outlets)} major outlets.",
+        'why_trending_ru': f"Эта история в тренде, потому что появляется в {len(outlets)} крупных изданиях.",
+        'source_urls': [outlet.url for outlet in load_registry() if outlet.short_name in outlets],
         'date': datetime.now().strftime('%Y-%m-%d'),
         'tags': [topic.lower(), 'trending', 'russia']
     }
 
 def main():
-    """Main execution function"""
-    print("=" * 80)
-    print("VIRAL RUSSIA NEWS - AUTOMATED COLLECTION")
-    print("=" * 80)
-    print()
-    
-    # Collect from all outlets
-    all_stories = []
-    all_stories.extend(extract_rt_news())
-    time.sleep(1)  # Be polite to servers
-    all_stories.extend(extract_tass_news())
-    time.sleep(1)
-    all_stories.extend(extract_ria_news())
-    time.sleep(1)
-    all_stories.extend(extract_rg_news())
-    time.sleep(1)
-    all_stories.extend(extract_kp_news())
-    time.sleep(1)
-    all_stories.extend(extract_lenta_news())
-    
-    print(f"\nTotal stories collected: {len(all_stories)}")
-    
-    # Find cross-outlet stories
-    cross_outlet_stories = find_cross_outlet_stories(all_stories)
-    print(f"Cross-outlet stories found: {len(cross_outlet_stories)}")
-    
-    # Calculate viral scores and rank
-    for story in cross_outlet_stories:
-        story['viral_score'] = calculate_viral_score(story)
-    
-    # Sort by viral score
-    ranked_stories = sorted(cross_outlet_stories, key=lambda x: x['viral_score'], reverse=True)
-    
-    # Take top 15
-    top_15 = ranked_stories[:15]
-    
-    # Generate enhanced stories
-    enhanced_stories = []
-    for i, story in enumerate(top_15, 1):
-        enhanced = generate_enhanced_story(
-            rank=i,
-            title=story['title'],
-            outlets=story['outlets'],
-            viral_score=story['viral_score']
-        )
-        enhanced_stories.append(enhanced)
-    
-    # Generate output JSON
-    output = {
-        'metadata': {
-            'generated_at': datetime.now().isoformat(),
-            'collection_period': datetime.now().strftime('%Y-%m-%d'),
-            'total_outlets': 6,
-            'outlets': [
-                {'name': 'RT Russian', 'url': 'https://russian.rt.com/'},
-                {'name': 'TASS', 'url': 'https://tass.ru/'},
-                {'name': 'RIA Novosti', 'url': 'https://ria.ru/'},
-                {'name': 'Rossiyskaya Gazeta', 'url': 'https://rg.ru/'},
-                {'name': 'Komsomolskaya Pravda', 'url': 'https://www.kp.ru/'},
-                {'name': 'Lenta.ru', 'url': 'https://lenta.ru/'}
-            ]
-        },
-        'stories': enhanced_stories
-    }
-    
-    # Save to file
-    output_path = 'public/viral_russia_news.json'
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
-    
-    print(f"\n✅ Successfully generated {output_path}")
-    print(f"   Top 15 stories ranked by viral score")
-    print("=" * 80)
+    """Main execution function: runs the in-process pipeline (see pipeline.py)"""
+    from pipeline import main as pipeline_main
+    pipeline_main()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate headline clustering
+Shingles -> MinHash signatures -> LSH banding -> Jaccard verification ->
+complete-linkage merging, so paraphrased headlines from different outlets end
+up in one cluster without comparing every pair, and every two headlines in a
+cluster are at least threshold-similar
+"""
+
+import random
+import time
+import zlib
+from collections import defaultdict
+
+from seen_index import normalize_headline
+
+NUM_PERM = 64
+SIMILARITY_THRESHOLD = 0.5
+
+# Word shingles are stems: the first STEM_LENGTH letters of each word, which
+# is enough to match most Russian inflections (закон/законах/законы)
+STEM_LENGTH = 5
+CHAR_SHINGLE_SIZE = 4
+
+# Buckets bigger than this are only checked against their first member, which
+# keeps degenerate inputs (thousands of identical headlines) linear
+MAX_BUCKET_PAIRS_SIZE = 100
+
+STOPWORDS = {
+    'что', 'для', 'это', 'как', 'или', 'при', 'его', 'она', 'они', 'так',
+    'все', 'уже', 'еще', 'после', 'также', 'the', 'and', 'for',
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+def shingles(title, mode='word'):
+    """Set of 32-bit shingle hashes for a headline ('word' stems or 'char' k-grams)"""
+    text = normalize_headline(title)
+    if mode == 'char':
+        grams = {text[i:i + CHAR_SHINGLE_SIZE] for i in range(max(1, len(text) - CHAR_SHINGLE_SIZE + 1))}
+    else:
+        grams = {word[:STEM_LENGTH] for word in text.split()
+                 if len(word) > 2 and word not in STOPWORDS}
+    return {zlib.crc32(gram.encode('utf-8')) for gram in grams}
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """(bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to threshold"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        # Prefer the lower midpoint on ties: false candidates are removed by
+        # the exact Jaccard check, missed pairs are not recoverable
+        error = abs(midpoint - threshold) + (0.001 if midpoint > threshold else 0)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+class MinHasher:
+    """Fixed family of universal hash permutations"""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.permutations = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return (0,) * self.num_perm
+        p = _MERSENNE_PRIME
+        return tuple(min([(a * h + b) % p for h in shingle_set]) for a, b in self.permutations)
+
+class ClusterResult:
+    """Clusters of item indices plus per-phase timings"""
+
+    def __init__(self, clusters, timings, candidate_pairs, threshold):
+        self.clusters = clusters
+        self.timings = timings
+        self.candidate_pairs = candidate_pairs
+        self.threshold = threshold
+
+    def __repr__(self):
+        phases = ', '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.timings.items())
+        return f"ClusterResult({len(self.clusters)} clusters, {self.candidate_pairs} candidate pairs, {phases})"
+
+def cluster_titles(titles, threshold=SIMILARITY_THRESHOLD, mode='word', num_perm=NUM_PERM):
+    """Group near-duplicate titles; returns a ClusterResult whose clusters list indices in input order
+
+    Two clusters are merged only if every pair across them meets threshold
+    (complete linkage); verified pairs are merged most similar first.
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    shingle_sets = [shingles(title, mode) for title in titles]
+    # Titles with the same shingle set are interchangeable, so each distinct
+    # set is clustered once; this also keeps repeated headlines cheap
+    distinct = {}
+    for index, shingle_set in enumerate(shingle_sets):
+        if shingle_set:
+            distinct.setdefault(frozenset(shingle_set), []).append(index)
+    sets = list(distinct)
+    timings['shingle'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(s) for s in sets]
+    timings['minhash'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bands, rows = lsh_params(threshold, num_perm)
+    buckets = defaultdict(list)
+    for band in range(bands):
+        lo, hi = band * rows, (band + 1) * rows
+        for index, signature in enumerate(signatures):
+            buckets[(band, signature[lo:hi])].append(index)
+    timings['lsh'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    checked = set()
+    similar = []
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        if len(members) > MAX_BUCKET_PAIRS_SIZE:
+            pairs = ((members[0], other) for other in members[1:])
+        else:
+            pairs = ((members[i], members[j]) for i in range(len(members))
+                     for j in range(i + 1, len(members)))
+        for pair in pairs:
+            if pair in checked:
+                continue  # Same pair from another band
+            checked.add(pair)
+            similarity = jaccard(sets[pair[0]], sets[pair[1]])
+            if similarity >= threshold:
+                similar.append((-similarity, pair[0], pair[1]))
+
+    similar.sort()
+    cluster_of = list(range(len(sets)))
+    members_of = {index: [index] for index in range(len(sets))}
+    for _, i, j in similar:
+        a, b = cluster_of[i], cluster_of[j]
+        if a == b:
+            continue
+        if all(jaccard(sets[x], sets[y]) >= threshold for x in members_of[a] for y in members_of[b]):
+            keep, drop = min(a, b), max(a, b)
+            for index in members_of[drop]:
+                cluster_of[index] = keep
+            members_of[keep].extend(members_of.pop(drop))
+
+    clusters = [sorted(index for member in members for index in distinct[sets[member]])
+                for members in members_of.values()]
+    # Titles without shingles match nothing
+    clusters += [[index] for index, shingle_set in enumerate(shingle_sets) if not shingle_set]
+    clusters.sort(key=lambda members: members[0])
+    timings['verify'] = time.perf_counter() - started
+
+    return ClusterResult(clusters, timings, len(checked), threshold)
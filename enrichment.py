@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limited executor for LLM enrichment calls
+Independent enrichment tasks run on a bounded thread pool; every API request
+they make goes through call(), which takes a token-bucket token and retries
+429 / 5xx / connection errors with jitter. Results come back in submission
+order
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+
+# Parallel in-flight requests
+MAX_CONCURRENCY = 8
+
+# Sustained request rate and burst size allowed by the token bucket
+REQUESTS_PER_SECOND = 5.0
+BURST = 8
+
+MAX_RETRIES = 5
+BASE_DELAY = 1.0
+MAX_DELAY = 30.0
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,  # includes APITimeoutError
+)
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def retry_delay(error, attempt):
+    """Seconds to wait before retrying: Retry-After if the server sent one, else full jitter"""
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+class EnrichmentExecutor:
+    """Runs independent enrichment calls concurrently under a rate limit"""
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, rate=REQUESTS_PER_SECOND,
+                 burst=BURST, max_retries=MAX_RETRIES):
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.retries = 0
+
+    def call(self, fn, *args, **kwargs):
+        """Make one API request fn(*args, **kwargs) under the rate limit, retrying transient errors"""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = retry_delay(e, attempt)
+                print(f"  Retrying after {type(e).__name__} in {delay:.1f}s")
+                self.retries += 1
+                time.sleep(delay)
+
+    def run_all(self, calls):
+        """Run zero-argument callables concurrently; results in the same order
+
+        The callables pass this executor to cached_completion, so only their
+        uncached requests are rate limited and retried.
+        """
+        if not calls:
+            return []
+        workers = min(self.max_concurrency, len(calls))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda call: call(), calls))
+
+    def map(self, fn, items):
+        """fn(item) for every item, concurrently; results in item order"""
+        return self.run_all([lambda item=item: fn(item) for item in items])
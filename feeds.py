@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+RSS / Atom / news-sitemap ingestion
+Feeds are parsed incrementally with iterparse while they download, and the
+download stops as soon as enough items have been read
+"""
+
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from story import Story
+
+# Local element names (namespace stripped) that delimit one feed item
+ITEM_TAGS = {'item', 'entry', 'url'}
+
+# Timestamp elements, most preferred first: the publication time, and Atom's
+# <updated> only for entries that have none (an edit does not make news new)
+DATE_TAGS = ('pubDate', 'published', 'publication_date', 'updated')
+
+class ChunkReader:
+    """File-like adapter over an iterable of byte chunks, for iterparse"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def close(self):
+        close = getattr(self._chunks, 'close', None)
+        if close:
+            close()
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def parse_date(value):
+    """Parse an RFC 822 (RSS) or ISO 8601 (Atom, sitemap) timestamp; None if unparseable"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+def _item_record(element):
+    """Title, canonical URL and timestamp of one <item>, <entry> or sitemap <url>"""
+    record = {'title': '', 'url': '', 'published': None}
+    dates = {}
+    for child in element.iter():
+        name = _local_name(child.tag)
+        text = (child.text or '').strip()
+        if name == 'title' and text:
+            record['title'] = text
+        elif name in ('link', 'loc') and not record['url']:
+            record['url'] = child.get('href') or text
+        elif name in DATE_TAGS and name not in dates:
+            dates[name] = text
+    for name in DATE_TAGS:
+        record['published'] = parse_date(dates.get(name))
+        if record['published']:
+            break
+    return record
+
+def iter_feed_items(source, limit=None):
+    """Yield item records from a feed file path, file object or iterable of byte chunks"""
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__') or hasattr(source, 'read'):
+        reader = source
+    else:
+        reader = ChunkReader(source)
+
+    count = 0
+    depth = 0
+    # Open elements, so a finished item can be detached from its parent
+    parents = []
+    try:
+        for event, element in ET.iterparse(reader, events=('start', 'end')):
+            is_item = _local_name(element.tag) in ITEM_TAGS
+            if event == 'start':
+                parents.append(element)
+                depth += is_item
+                continue
+            parents.pop()
+            if not is_item:
+                continue
+            depth -= 1
+            if depth:
+                continue
+            record = _item_record(element)
+            # Keep memory flat on large feeds: clearing alone would leave an
+            # empty element per item attached to <channel> or <urlset>
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+            if record['title']:
+                yield record
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        if isinstance(reader, ChunkReader):
+            reader.close()
+
+def extract_feed_stories(outlet, source, limit=None):
+    """Feed items as story records in the same shape as extract_stories"""
+    stories = []
+    for item in iter_feed_items(source, limit or outlet.max_stories):
+        stories.append(Story(
+            item['title'],
+            outlet.id,
+            outlet.default_prominence,
+            url=item['url'],
+            published=item['published'].isoformat() if item['published'] else None,
+        ))
+    return stories
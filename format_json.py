@@ -1,5 +1,7 @@
 import json
 from datetime import datetime
+from outlets import load_registry
+from static_output import publish_json
 
 # Read the existing data
 with open('/home/ubuntu/viral-russia-news/data/viral_stories.json', 'r', encoding='utf-8') as f:
@@ -31,22 +33,14 @@ output = {
     "metadata": {
         "generated_at": data['generated_at'],
         "collection_period": "2025-11-01",
-        "total_outlets": 6,
+        "total_outlets": len(load_registry()),
         "total_stories_analyzed": data['total_stories_analyzed'],
-        "outlets": [
-            {"name": "RT Russian", "url": "https://russian.rt.com/"},
-            {"name": "TASS", "url": "https://tass.ru/"},
-            {"name": "RIA Novosti", "url": "https://ria.ru/"},
-            {"name": "Rossiyskaya Gazeta", "url": "https://rg.ru/"},
-            {"name": "Komsomolskaya Pravda", "url": "https://www.kp.ru/"},
-            {"name": "Lenta.ru", "url": "https://lenta.ru/"}
-        ]
+        "outlets": load_registry().source_info()
     },
     "stories": formatted_stories
 }
 
 # Write to file
-with open('/home/ubuntu/viral-russia-news/public/viral_russia_news.json', 'w', encoding='utf-8') as f:
-    json.dump(output, f, ensure_ascii=False, indent=2)
+publish_json('/home/ubuntu/viral-russia-news/public/viral_russia_news.json', output)
 
 print(f"Successfully formatted {len(formatted_stories)} stories")
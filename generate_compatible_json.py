@@ -6,6 +6,8 @@ Generate JSON in the format expected by the website.
 import json
 from datetime import datetime
 from pathlib import Path
+from outlets import load_registry
+from static_output import publish_json
 
 def generate_compatible_json():
     """Generate JSON matching the website's expected structure."""
@@ -25,15 +27,8 @@ def generate_compatible_json():
         "metadata": {
             "generated_at": current_date.isoformat(),
             "collection_period": current_date.strftime('%Y-%m-%d'),
-            "total_outlets": 6,
-            "outlets": [
-                {"name": "RT Russian", "url": "https://russian.rt.com/"},
-                {"name": "TASS", "url": "https://tass.ru/"},
-                {"name": "RIA Novosti", "url": "https://ria.ru/"},
-                {"name": "Rossiyskaya Gazeta", "url": "https://rg.ru/"},
-                {"name": "Komsomolskaya Pravda", "url": "https://www.kp.ru/"},
-                {"name": "Lenta.ru", "url": "https://lenta.ru/"}
-            ]
+            "total_outlets": len(load_registry()),
+            "outlets": load_registry().source_info()
         },
         "stories": []
     }
@@ -65,15 +60,7 @@ def generate_compatible_json():
 
 def get_outlet_url(outlet_name):
     """Get URL for outlet."""
-    urls = {
-        'RT': 'https://russian.rt.com/',
-        'TASS': 'https://tass.ru/',
-        'RIA Novosti': 'https://ria.ru/',
-        'Rossiyskaya Gazeta': 'https://rg.ru/',
-        'Komsomolskaya Pravda': 'https://www.kp.ru/',
-        'Lenta.ru': 'https://lenta.ru/'
-    }
-    return urls.get(outlet_name, '')
+    return load_registry().url_for(outlet_name)
 
 def main():
     print("Generating compatible JSON structure...")
@@ -86,9 +73,10 @@ def main():
     
     # Save to public directory
     output_file = Path('/home/ubuntu/viral-russia-news/public/viral_russia_news.json')
-    output_file.write_text(json.dumps(output_data, ensure_ascii=False, indent=2), encoding='utf-8')
-    
-    print(f"\n✓ Generated compatible JSON: {output_file}")
+    if publish_json(output_file, output_data):
+        print(f"\n✓ Generated compatible JSON: {output_file}")
+    else:
+        print(f"\n✓ Ranked stories unchanged; {output_file} left as it is")
     print(f"  - Total stories: {len(output_data['stories'])}")
     print(f"  - Generated at: {output_data['metadata']['generated_at']}")
     print(f"  - Collection period: {output_data['metadata']['collection_period']}")
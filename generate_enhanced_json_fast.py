@@ -6,18 +6,15 @@ import json
 from datetime import datetime
 from pathlib import Path
 from openai import OpenAI
+from llm_cache import cached_completion, LLM_CACHE
+from outlets import load_registry
+from taxonomy import classify
+from static_output import publish_json
 
 client = OpenAI()
 
 def get_source_info():
-    return [
-        {"name": "RT Russian", "url": "https://russian.rt.com/"},
-        {"name": "TASS", "url": "https://tass.ru/"},
-        {"name": "RIA Novosti", "url": "https://ria.ru/"},
-        {"name": "Rossiyskaya Gazeta", "url": "https://rg.ru/"},
-        {"name": "Komsomolskaya Pravda", "url": "https://www.kp.ru/"},
-        {"name": "Lenta.ru", "url": "https://lenta.ru/"},
-    ]
+    return load_registry().source_info()
 
 def batch_translate_stories(stories):
     """Translate all stories in a single LLM call"""
@@ -53,7 +50,8 @@ Return JSON with a 'stories' array:
 
     try:
         print("Calling LLM for batch translation...")
-        response = client.chat.completions.create(
+        response = cached_completion(
+            client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are a professional news translator specializing in Russian media. Provide accurate, concise translations."},
@@ -63,7 +61,7 @@ Return JSON with a 'stories' array:
             response_format={"type": "json_object"}
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response)
         # LLM returns translations in 'stories', 'news', or 'translations' array
         translations = result.get('stories', result.get('news', result.get('translations', [])))
         print(f"✓ Received translations for {len(translations)} stories")
@@ -74,11 +72,9 @@ Return JSON with a 'stories' array:
 
 def generate_tags(title, category):
     tags = []
-    title_lower = title.lower()
 
     if category == "Ukraine Conflict": tags.append("ukraine-conflict")
-    if "трамп" in title_lower: tags.append("trump")
-    if "путин" in title_lower: tags.append("putin")
+    tags.extend(classify(title).tags)
     return tags[:3]
 
 def main():
@@ -105,7 +101,7 @@ def main():
             "title": translation["title_en"],
             "title_ru": story["title"],
             "source": story["source"],
-            "source_url": next((s["url"] for s in get_source_info() if s["name"] == story["source"]), ""),
+            "source_url": load_registry().url_for(story["source"]),
             "time": story.get("time", "Recent"),
             "category": story.get("category", "General News"),
             "viral_score": story["viral_score"],
@@ -127,16 +123,19 @@ def main():
         "metadata": {
             "generated_at": datetime.utcnow().isoformat(),
             "collection_period": datetime.utcnow().strftime("%Y-%m-%d"),
-            "total_outlets": 6,
+            "total_outlets": len(load_registry()),
             "outlets": get_source_info()
         },
         "stories": enhanced_stories
     }
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(enhanced_data, f, ensure_ascii=False, indent=2)
+    changed = publish_json(output_file, enhanced_data)
 
-    print(f"\n✓ Enhanced JSON generated: {output_file}")
+    print(LLM_CACHE.report())
+    if changed:
+        print(f"\n✓ Enhanced JSON generated: {output_file}")
+    else:
+        print(f"\n✓ Ranked stories unchanged; {output_file} left as it is")
 
 if __name__ == "__main__":
     main()
@@ -5,32 +5,17 @@ Generate enhanced JSON file with complete metadata for web deployment
 import json
 from datetime import datetime
 from pathlib import Path
+from outlets import load_registry
+from static_output import publish_json
+from taxonomy import classify
 
 def get_source_info():
     """Get source information with URLs"""
-    return [
-        {"name": "RT Russian", "url": "https://russian.rt.com/"},
-        {"name": "TASS", "url": "https://tass.ru/"},
-        {"name": "RIA Novosti", "url": "https://ria.ru/"},
-        {"name": "Rossiyskaya Gazeta", "url": "https://rg.ru/"},
-        {"name": "Komsomolskaya Pravda", "url": "https://www.kp.ru/"},
-        {"name": "Lenta.ru", "url": "https://lenta.ru/"},
-    ]
+    return load_registry().source_info()
 
 def get_category(title):
     """Determine category based on title keywords"""
-    title_lower = title.lower()
-    
-    if any(kw in title_lower for kw in ['трамп', 'сша', 'нато', 'европ', 'запад', 'нигери']):
-        return 'International'
-    elif any(kw in title_lower for kw in ['украин', 'всу', 'сво', 'зеленский', 'купянск', 'покровск', 'красноармейск']):
-        return 'Ukraine Conflict'
-    elif any(kw in title_lower for kw in ['путин', 'россия', 'рф', 'мвф', 'премия']):
-        return 'Russia'
-    elif any(kw in title_lower for kw in ['оружи', 'военн', 'армия', 'тэс', 'удар', 'экраноплан', 'tomahawk']):
-        return 'Military & Defense'
-    else:
-        return 'General News'
+    return classify(title).category
 
 def format_time_for_display(time_str):
     """Format time string for better display"""
@@ -49,11 +34,7 @@ def format_time_for_display(time_str):
 
 def get_source_url(source_name):
     """Get the homepage URL for each source"""
-    sources = get_source_info()
-    for source in sources:
-        if source['name'] == source_name:
-            return source['url']
-    return ''
+    return load_registry().url_for(source_name)
 
 def main():
     data_dir = Path('/home/ubuntu/viral-russia-news/data')
@@ -69,7 +50,7 @@ def main():
         'metadata': {
             'generated_at': datetime.utcnow().isoformat(),
             'collection_period': datetime.utcnow().strftime('%Y-%m-%d'),
-            'total_outlets': 6,
+            'total_outlets': len(load_registry()),
             'outlets': get_source_info()
         },
         'stories': []
@@ -89,11 +70,10 @@ def main():
         enhanced_data['stories'].append(enhanced_story)
     
     # Save enhanced JSON
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(enhanced_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"Enhanced JSON generated: {output_file}")
+    if publish_json(output_file, enhanced_data):
+        print(f"Enhanced JSON generated: {output_file}")
+    else:
+        print(f"Ranked stories unchanged, left {output_file} as it is")
     print(f"\nMetadata:")
     print(f"  Generated at: {enhanced_data['metadata']['generated_at']}")
     print(f"  Total stories: {len(enhanced_data['stories'])}")
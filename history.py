@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Append-only history of every run: collected headlines, clusters, scores and
+published rankings
+One SQLite database in WAL mode; each run is written with bulk inserts in a
+single transaction, and later stages and analytics query it instead of
+re-reading old JSON files
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from seen_index import title_fingerprint
+from story import Story, outlet_id
+
+HISTORY_PATH = Path('.cache/history.sqlite3')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS headlines (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    day TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    outlet TEXT NOT NULL,  -- OutletId name, e.g. 'RT'
+    title TEXT NOT NULL,
+    url TEXT,
+    prominence TEXT,
+    fingerprint INTEGER NOT NULL,
+    is_new INTEGER
+);
+CREATE INDEX IF NOT EXISTS headlines_day ON headlines (day);
+CREATE INDEX IF NOT EXISTS headlines_outlet ON headlines (outlet, day);
+CREATE INDEX IF NOT EXISTS headlines_fingerprint ON headlines (fingerprint);
+CREATE TABLE IF NOT EXISTS clusters (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    title TEXT NOT NULL,
+    outlet_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS clusters_run ON clusters (run_id);
+CREATE TABLE IF NOT EXISTS cluster_members (
+    cluster_id INTEGER NOT NULL REFERENCES clusters (id),
+    headline_id INTEGER NOT NULL REFERENCES headlines (id)
+);
+CREATE INDEX IF NOT EXISTS cluster_members_cluster ON cluster_members (cluster_id);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    profile TEXT NOT NULL,
+    headline_id INTEGER REFERENCES headlines (id),
+    cluster_id INTEGER REFERENCES clusters (id),
+    score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_run ON scores (run_id);
+CREATE TABLE IF NOT EXISTS rankings (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    day TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    title_ru TEXT,
+    viral_score INTEGER,
+    story TEXT NOT NULL,
+    PRIMARY KEY (run_id, rank)
+);
+CREATE INDEX IF NOT EXISTS rankings_day ON rankings (day);
+'''
+
+def _signed(fp):
+    """64-bit fingerprint as the signed integer SQLite stores"""
+    return fp - (1 << 64) if fp >= 1 << 63 else fp
+
+def headline_fingerprint(title):
+    """Signed fingerprint of a normalized headline (matches SeenIndex's title fingerprints)"""
+    return _signed(title_fingerprint(title))
+
+def _headline_row(story):
+    """(outlet, title, url, prominence, fingerprint, is_new) of a Story or story dict"""
+    # Enrichment replaces 'title' with the English one; record the collected headline
+    title = story.get('title_ru') or story['title']
+    if isinstance(story, Story):
+        # _name_/_value_ skip the enum property machinery, which dominates at this volume
+        return (story.outlet._name_, title, story.url,
+                getattr(story.prominence, '_value_', story.prominence),
+                headline_fingerprint(title), story.is_new)
+    return (outlet_id(story.get('outlet') or story['source']).name, title, story.get('url'),
+            story.get('prominence'), headline_fingerprint(title), story.get('is_new'))
+
+class HistoryStore:
+    """Append-only run history in SQLite"""
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = Path(path)
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            # Durable at checkpoints; a crash can lose at most the last run
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def record_run(self, source, headlines, clusters=(), scores=None, ranking=()):
+        """Write one run in a single transaction; returns the run id
+
+        headlines: story records (title, outlet, url, prominence, is_new)
+        clusters: dicts with 'title', 'count' and 'indices' into headlines
+        scores: {'profile': name, 'headlines' or 'clusters': [score, ...]}
+        ranking: published story dicts, in rank order
+        """
+        now = time.time()
+        day = datetime.fromtimestamp(now, timezone.utc).strftime('%Y-%m-%d')
+        connection = self.connection
+        with connection:
+            run_id = connection.execute(
+                'INSERT INTO runs (started_at, day, source) VALUES (?, ?, ?)', (now, day, source)).lastrowid
+
+            # Append-only with one writer per run: ids can be assigned up front,
+            # so clusters can reference headlines without reading rowids back
+            first_headline = self._next_id('headlines')
+            connection.executemany(
+                'INSERT INTO headlines (id, run_id, day, seen_at, outlet, title, url, prominence, fingerprint, is_new) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(first_headline + i, run_id, day, now) + _headline_row(story)
+                 for i, story in enumerate(headlines)])
+
+            first_cluster = self._next_id('clusters')
+            connection.executemany(
+                'INSERT INTO clusters (id, run_id, title, outlet_count) VALUES (?, ?, ?, ?)',
+                [(first_cluster + i, run_id, cluster['title'], cluster['count'])
+                 for i, cluster in enumerate(clusters)])
+            connection.executemany(
+                'INSERT INTO cluster_members (cluster_id, headline_id) VALUES (?, ?)',
+                [(first_cluster + i, first_headline + index)
+                 for i, cluster in enumerate(clusters) for index in cluster['indices']])
+
+            if scores:
+                rows = [(run_id, scores['profile'], first_headline + i, None, score)
+                        for i, score in enumerate(scores.get('headlines', ()))]
+                rows += [(run_id, scores['profile'], None, first_cluster + i, score)
+                         for i, score in enumerate(scores.get('clusters', ()))]
+                connection.executemany(
+                    'INSERT INTO scores (run_id, profile, headline_id, cluster_id, score) VALUES (?, ?, ?, ?, ?)',
+                    rows)
+
+            connection.executemany(
+                'INSERT INTO rankings (run_id, day, rank, title, title_ru, viral_score, story) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(run_id, day, rank, story['title'], story.get('title_ru'), story.get('viral_score'),
+                  json.dumps(story, ensure_ascii=False))
+                 for rank, story in enumerate(ranking, 1)])
+        return run_id
+
+    def _next_id(self, table):
+        return self.connection.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {table}').fetchone()[0]
+
+    def latest_ranking(self, sources=None):
+        """Published story dicts of the most recent run that published any, in rank order
+
+        sources limits the search to runs recorded with one of those source names.
+        """
+        query = 'SELECT MAX(rankings.run_id) FROM rankings JOIN runs ON runs.id = rankings.run_id'
+        params = ()
+        if sources:
+            query += f" WHERE runs.source IN ({', '.join('?' * len(sources))})"
+            params = tuple(sources)
+        run_id = self.connection.execute(query, params).fetchone()[0]
+        rows = self.connection.execute(
+            'SELECT story FROM rankings WHERE run_id = ? ORDER BY rank', (run_id,)).fetchall()
+        return [json.loads(story) for (story,) in rows]
+
+    def daily_rankings(self, since_day, sources=None):
+        """{day: published story dicts of that day's last publishing run} from since_day on"""
+        query = ('SELECT rankings.day, MAX(rankings.run_id) FROM rankings JOIN runs ON runs.id = rankings.run_id '
+                 'WHERE rankings.day >= ?')
+        params = (since_day,)
+        if sources:
+            query += f" AND runs.source IN ({', '.join('?' * len(sources))})"
+            params += tuple(sources)
+        days = {}
+        for day, run_id in self.connection.execute(query + ' GROUP BY rankings.day', params).fetchall():
+            rows = self.connection.execute(
+                'SELECT story FROM rankings WHERE run_id = ? ORDER BY rank', (run_id,)).fetchall()
+            days[day] = [json.loads(story) for (story,) in rows]
+        return days
+
+    def first_seen(self, title):
+        """Unix time a headline (after normalization) was first collected, or None"""
+        row = self.connection.execute(
+            'SELECT MIN(seen_at) FROM headlines WHERE fingerprint = ?', (headline_fingerprint(title),)).fetchone()
+        return row[0]
+
+    def outlet_counts(self, since_day):
+        """{day: {outlet: headlines}} for every day from since_day ('YYYY-MM-DD') on"""
+        counts = {}
+        for day, outlet, count in self.connection.execute(
+                'SELECT day, outlet, COUNT(*) FROM headlines WHERE day >= ? GROUP BY day, outlet ORDER BY day',
+                (since_day,)):
+            counts.setdefault(day, {})[outlet] = count
+        return counts
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Pluggable HTML parser backends for outlet extraction
+Every backend returns the same (title, classes) records for an outlet's
+headline containers; faster backends are used automatically when installed
+"""
+
+import os
+
+# Preferred order when PARSER_BACKEND is 'auto'
+BACKEND_PREFERENCE = ['selectolax', 'lxml', 'html.parser']
+
+# Override with the VRN_PARSER environment variable
+PARSER_BACKEND = os.environ.get('VRN_PARSER', 'auto')
+
+class SoupBackend:
+    """BeautifulSoup backend that only builds the subtrees matching the outlet's containers"""
+
+    def __init__(self, features):
+        from bs4 import BeautifulSoup, SoupStrainer
+        self.name = features
+        self.features = features
+        self._soup = BeautifulSoup
+        self._strainer = SoupStrainer
+        self._strainers = {}
+
+    def _strainer_for(self, outlet):
+        strainer = self._strainers.get(outlet.id)
+        if strainer is None:
+            classes = set(outlet.container_classes)
+            # While parsing, the class attribute may still be one unsplit string
+            def class_matches(value):
+                if not value:
+                    return False
+                tokens = value.split() if isinstance(value, str) else value
+                return any(token in classes for token in tokens)
+            strainer = self._strainer(outlet.container_tags,
+                                      class_=class_matches if classes else None)
+            self._strainers[outlet.id] = strainer
+        return strainer
+
+    def headlines(self, outlet, html):
+        """Yield (title, classes) for the first scan_limit containers"""
+        soup = self._soup(html, self.features, parse_only=self._strainer_for(outlet))
+        for container in outlet.find_containers(soup):
+            title_elem = container.find(outlet.title_tags) if outlet.title_tags else container
+            if title_elem:
+                yield title_elem.get_text(strip=True), container.get('class', [])
+
+class SelectolaxBackend:
+    """Lexbor-based backend driven by a CSS selector compiled from the outlet's rules"""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+        self._selectors = {}
+
+    def _selectors_for(self, outlet):
+        selectors = self._selectors.get(outlet.id)
+        if selectors is None:
+            # :is() keeps each element once even when it matches several classes
+            containers = f":is({', '.join(outlet.container_tags)})"
+            if outlet.container_classes:
+                classes = ', '.join(f'.{cls}' for cls in outlet.container_classes)
+                containers += f":is({classes})"
+            selectors = (containers, ', '.join(outlet.title_tags))
+            self._selectors[outlet.id] = selectors
+        return selectors
+
+    def headlines(self, outlet, html):
+        """Yield (title, classes) for the first scan_limit containers"""
+        containers, titles = self._selectors_for(outlet)
+        tree = self._parser(html)
+        # text() would include script and style bodies, which get_text() skips
+        tree.strip_tags(['script', 'style'])
+        for container in tree.css(containers)[:outlet.scan_limit]:
+            title_elem = container.css_first(titles) if titles else container
+            if title_elem:
+                classes = (container.attributes.get('class') or '').split()
+                yield title_elem.text(deep=True, separator='', strip=True), classes
+
+def _create(name):
+    if name == 'selectolax':
+        return SelectolaxBackend()
+    if name == 'lxml':
+        import lxml  # noqa: F401  (BeautifulSoup needs it for the 'lxml' feature)
+        return SoupBackend('lxml')
+    if name == 'html.parser':
+        return SoupBackend('html.parser')
+    raise ValueError(f"Unknown parser backend: {name}")
+
+_backends = {}
+
+def available_backends():
+    """Names of the backends that can be created in this environment"""
+    names = []
+    for name in BACKEND_PREFERENCE:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def get_backend(name=None):
+    """Return a (cached) backend by name; 'auto' picks the fastest installed one"""
+    name = name or PARSER_BACKEND
+    if name == 'auto':
+        for candidate in BACKEND_PREFERENCE:
+            try:
+                return get_backend(candidate)
+            except ImportError:
+                continue
+    if name not in _backends:
+        _backends[name] = _create(name)
+    return _backends[name]
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk HTTP cache with conditional requests
+Stores body, ETag and Last-Modified per URL so repeated fetches can be
+revalidated with If-None-Match / If-Modified-Since and answered from disk on 304
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+CACHE_DIR = Path('.cache/http')
+
+# Total size of cached bodies before least-recently-used entries are evicted
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+
+# Seconds a cached page is served without touching the network, per host.
+# Use '*' for a default that applies to every host. Hosts that send neither
+# ETag nor Last-Modified can only be cached through this override.
+HOST_MAX_AGE = {}
+
+class HTTPCache:
+    """URL -> (validators, body) cache with size-bounded LRU eviction"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, max_age=None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = dict(HOST_MAX_AGE if max_age is None else max_age)
+        self._lock = threading.Lock()
+        self._index_path = self.directory / 'index.json'
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _body_path(self, entry):
+        return self.directory / f"{entry['key']}.body"
+
+    def lookup(self, url):
+        """Return the cache entry for url, or None"""
+        with self._lock:
+            entry = self._index.get(url)
+            if entry and not self._body_path(entry).exists():
+                del self._index[url]
+                return None
+            return entry
+
+    def _max_age_for(self, url):
+        host = urlparse(url).netloc
+        return self.max_age.get(host, self.max_age.get('*'))
+
+    def is_fresh(self, url, entry):
+        """True if entry may be served without revalidation"""
+        max_age = self._max_age_for(url)
+        if max_age is None:
+            return False
+        return time.time() - entry['stored_at'] < max_age
+
+    def conditional_headers(self, entry):
+        """Request headers that revalidate entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read(self, url, entry, revalidated=False):
+        """Return (body bytes, encoding) for entry and mark it as recently used"""
+        with open(self._body_path(entry), 'rb') as f:
+            body = f.read()
+        with self._lock:
+            entry['last_used'] = time.time()
+            if revalidated:
+                entry['stored_at'] = entry['last_used']
+            self._save_index()
+        return body, entry.get('encoding')
+
+    def store(self, url, body, encoding, headers):
+        """Save a 200 response body together with its validators"""
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        entry = {
+            'key': key,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'encoding': encoding,
+            'size': len(body),
+            'stored_at': time.time(),
+            'last_used': time.time(),
+        }
+        if not entry['etag'] and not entry['last_modified'] and self._max_age_for(url) is None:
+            return  # Nothing to revalidate with and no max-age override
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.directory / f"{key}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, self._body_path(entry))
+            self._index[url] = entry
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits max_bytes"""
+        total = sum(e['size'] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            try:
+                self._body_path(entry).unlink()
+            except OSError:
+                pass
+            total -= entry['size']
+            del self._index[url]
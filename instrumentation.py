@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Spans for a pipeline run: wall and CPU time, peak memory, bytes fetched,
+item counts and LLM calls, tokens and latency
+Each finished span is appended to a JSON-lines file. The transport and the
+LLM client report into shared counters, and a span records how much they
+grew while it was open: stage spans read the process-wide counters, outlet
+spans (which run in worker threads) read their own thread's.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SPANS_PATH = Path('logs/spans.jsonl')
+LOG_DIR = Path('logs')
+
+COUNTERS = ('requests', 'bytes_fetched', 'llm_calls', 'llm_cache_hits',
+            'llm_prompt_tokens', 'llm_completion_tokens', 'llm_seconds')
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if os.uname().sysname == 'Darwin' else 1024), 1)
+
+class Span:
+    """Attributes of one open span; set() adds or overwrites them"""
+
+    def __init__(self, name, kind, attrs):
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+class Tracer:
+    """Shared counters plus a writer for finished spans"""
+
+    def __init__(self):
+        self.run_id = None
+        self.path = None
+        self.totals = dict.fromkeys(COUNTERS, 0)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def open(self, path=SPANS_PATH):
+        """Start a new run whose spans are appended to path"""
+        self.run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return self.run_id
+
+    def _thread_totals(self):
+        totals = getattr(self._local, 'totals', None)
+        if totals is None:
+            totals = self._local.totals = dict.fromkeys(COUNTERS, 0)
+        return totals
+
+    def count(self, **amounts):
+        """Add to the counters, e.g. count(requests=1, bytes_fetched=n)"""
+        thread_totals = self._thread_totals()
+        with self._lock:
+            for name, amount in amounts.items():
+                self.totals[name] += amount
+        for name, amount in amounts.items():
+            thread_totals[name] += amount
+
+    def _snapshot(self, scope):
+        if scope == 'thread':
+            return dict(self._thread_totals()), time.thread_time()
+        with self._lock:
+            return dict(self.totals), time.process_time()
+
+    @contextmanager
+    def span(self, name, kind='stage', scope='process', **attrs):
+        """Time the block and record the counters' growth
+
+        scope='thread' measures only the current thread (CPU time and
+        counters), for work running concurrently with other spans.
+        """
+        span = Span(name, kind, attrs)
+        before, cpu_before = self._snapshot(scope)
+        started_at = time.time()
+        started = time.perf_counter()
+        # Stages run one after another, so each can have the heap peak to itself
+        track_heap = tracemalloc.is_tracing() and kind == 'stage'
+        if track_heap:
+            tracemalloc.reset_peak()
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            wall = time.perf_counter() - started
+            after, cpu_after = self._snapshot(scope)
+            record = {
+                'run': self.run_id, 'name': name, 'kind': kind, 'start': round(started_at, 3),
+                'wall_s': round(wall, 4), 'cpu_s': round(cpu_after - cpu_before, 4),
+                'peak_rss_mb': peak_rss_mb(),
+            }
+            if track_heap:
+                record['py_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+            for counter in COUNTERS:
+                grown = after[counter] - before[counter]
+                if grown:
+                    record[counter] = round(grown, 4) if isinstance(grown, float) else grown
+            record.update(span.attrs)
+            self._write(record)
+
+    def _write(self, record):
+        if self.path is None:
+            return
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+TRACER = Tracer()
+
+@contextmanager
+def profiling(log_dir=LOG_DIR, label='pipeline', top=30):
+    """cProfile (main thread) and tracemalloc the block; writes a .prof and text summaries to log_dir"""
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    stem = log_dir / f"{label}_{datetime.now():%Y%m%d_%H%M%S}"
+    profiler = cProfile.Profile()
+    tracemalloc.start(10)
+    profiler.enable()
+    try:
+        yield stem
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        profiler.dump_stats(f"{stem}.prof")
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(top)
+        Path(f"{stem}.profile.txt").write_text(summary.getvalue(), encoding='utf-8')
+
+        # Per-stage heap peaks are in the stage spans (py_peak_mb)
+        lines = [f"Python heap: {current / 2 ** 20:.1f} MB live at exit", '']
+        lines += [str(stat) for stat in snapshot.statistics('lineno')[:top]]
+        Path(f"{stem}.tracemalloc.txt").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        print(f"Profile written to {stem}.prof, {stem}.profile.txt and {stem}.tracemalloc.txt")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for chat-completion calls
+Responses are stored in SQLite keyed by a hash of the full request, with TTL
+and size-bounded LRU eviction; WAL mode makes it safe to share between
+concurrently running scripts
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+from instrumentation import TRACER
+
+CACHE_PATH = Path('.cache/llm.sqlite3')
+
+# Cached answers older than this are requested again
+CACHE_TTL = 30 * 24 * 3600
+
+# Least-recently-used entries beyond this count are evicted
+MAX_ENTRIES = 50_000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+'''
+
+def request_key(model, messages, **params):
+    """Stable hash of everything that determines a completion"""
+    payload = {'model': model, 'messages': messages}
+    payload.update({name: value for name, value in params.items() if value is not None})
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class LLMCache:
+    """SQLite-backed completion cache with hit/miss counters"""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        """Cached content for key, or None if missing or expired"""
+        connection = self._connection()
+        row = connection.execute('SELECT content, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            with self._counter_lock:
+                self.misses += 1
+            return None
+        with connection:
+            connection.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+        with self._counter_lock:
+            self.hits += 1
+        return row[0]
+
+    def put(self, key, model, content):
+        """Store content and evict expired and least-recently-used entries"""
+        connection = self._connection()
+        now = time.time()
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO responses (key, model, content, created_at, last_used) '
+                'VALUES (?, ?, ?, ?, ?)', (key, model, content, now, now))
+            connection.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+            connection.execute(
+                'DELETE FROM responses WHERE key IN ('
+                'SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,))
+
+    def report(self):
+        """One-line hit/miss summary"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        return f"LLM cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+LLM_CACHE = LLMCache()
+
+def _create(client, model, messages, **params):
+    """Uncached completion call, reported to the tracer with its tokens and latency"""
+    started = time.perf_counter()
+    response = client.chat.completions.create(model=model, messages=messages, **params)
+    usage = getattr(response, 'usage', None)
+    TRACER.count(llm_calls=1, llm_seconds=time.perf_counter() - started,
+                 llm_prompt_tokens=getattr(usage, 'prompt_tokens', 0) or 0,
+                 llm_completion_tokens=getattr(usage, 'completion_tokens', 0) or 0)
+    return response
+
+def cached_completion(client, model, messages, cache=LLM_CACHE, executor=None, **params):
+    """Message content of a chat completion, served from cache when the same request was made before
+
+    Requests that miss the cache go through executor.call (rate limit and
+    retries, see enrichment.py) when an executor is given; hits never wait.
+    """
+    create = partial(executor.call, _create) if executor is not None else _create
+    if cache is None:
+        response = create(client, model, messages, **params)
+        return response.choices[0].message.content
+
+    key = request_key(model, messages, **params)
+    content = cache.get(key)
+    if content is None:
+        response = create(client, model, messages, **params)
+        content = response.choices[0].message.content
+        if content is not None:
+            cache.put(key, model, content)
+    else:
+        TRACER.count(llm_cache_hits=1)
+    return content
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Story momentum across successive runs
+Each story keeps a short rolling window of (run time, outlet count)
+observations keyed by its headline fingerprints, so every run can tell how
+old a story really is and whether its coverage is growing or fading, without
+rescanning earlier runs
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from seen_index import title_fingerprint
+
+MOMENTUM_PATH = Path('.cache/momentum.json')
+
+# Stories not observed for this long are dropped from the window
+WINDOW_HOURS = 72
+
+# Observations kept per story (the first one is always kept for its age)
+MAX_OBSERVATIONS = 8
+
+class MomentumTracker:
+    """Rolling window of per-story coverage observations"""
+
+    def __init__(self, path=MOMENTUM_PATH, window_hours=WINDOW_HOURS):
+        self.path = Path(path)
+        self.window = window_hours * 3600
+        # story id -> [[run time, outlet count], ...], oldest first
+        self.stories = {}
+        # headline fingerprint -> story id, so reworded members find their story
+        self.aliases = {}
+        self._next_id = 1
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.stories = {int(key): value for key, value in state.get('stories', {}).items()}
+        self.aliases = {int(key): value for key, value in state.get('aliases', {}).items()}
+        self._next_id = state.get('next_id', max(self.stories, default=0) + 1)
+
+    def save(self):
+        """Write the window atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'next_id': self._next_id, 'stories': self.stories, 'aliases': self.aliases}, f)
+        os.replace(tmp_path, self.path)
+
+    def observe(self, clusters, now=None):
+        """Record this run's clusters; sets 'age_hours' and 'momentum' on each
+
+        age_hours is the time since the story was first observed (or since its
+        earliest known publication time, if older). momentum is the change in
+        outlet count since the story's previous observation; a story seen for
+        the first time starts from zero outlets.
+        """
+        now = time.time() if now is None else now
+        for cluster in clusters:
+            titles = [member['title'] for member in cluster.get('members', ())] or [cluster['title']]
+            fingerprints = [title_fingerprint(title) for title in titles]
+            story_id = next((self.aliases[fp] for fp in fingerprints if fp in self.aliases), None)
+            if story_id is None or story_id not in self.stories:
+                story_id = self._next_id
+                self._next_id += 1
+                self.stories[story_id] = []
+            for fp in fingerprints:
+                self.aliases[fp] = story_id
+
+            observations = self.stories[story_id]
+            previous = observations[-1][1] if observations else 0
+            first_seen = observations[0][0] if observations else now
+            published = cluster.get('published_at')
+            if published:
+                first_seen = min(first_seen, published)
+
+            observations.append([now, cluster['count']])
+            if len(observations) > MAX_OBSERVATIONS:
+                del observations[1:len(observations) - MAX_OBSERVATIONS + 1]
+
+            cluster['age_hours'] = (now - first_seen) / 3600
+            cluster['momentum'] = cluster['count'] - previous
+
+        self._expire(now)
+
+    def _expire(self, now):
+        expired = {story_id for story_id, observations in self.stories.items()
+                   if now - observations[-1][0] > self.window}
+        if expired:
+            for story_id in expired:
+                del self.stories[story_id]
+            self.aliases = {fp: story_id for fp, story_id in self.aliases.items() if story_id not in expired}
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Outlet registry
+Loads outlets.json once per process and precompiles each outlet's selectors,
+so one generic extractor can scrape every configured source
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from html_parsers import get_backend
+from story import Story
+
+OUTLETS_FILE = Path(__file__).resolve().parent / 'outlets.json'
+
+class Outlet:
+    """One news source with its precompiled scraping rules"""
+
+    def __init__(self, config, defaults):
+        settings = dict(defaults)
+        settings.update(config)
+        self.id = settings['id']
+        self.name = settings['name']
+        self.short_name = settings.get('short_name', self.name)
+        self.url = settings['url']
+        self.stories_file = settings.get('stories_file')
+        self.feed_url = settings.get('feed_url')
+        # 'html' scrapes the homepage, 'feed' reads feed_url (RSS, Atom or news sitemap)
+        self.collector = settings['collector']
+        self.scan_limit = settings['scan_limit']
+        self.max_stories = settings['max_stories']
+        self.min_title_length = settings['min_title_length']
+
+        selectors = settings['selectors']
+        self.container_tags = list(selectors['container_tags'])
+        self.container_classes = list(selectors.get('container_classes', []))
+        self.title_tags = list(selectors.get('title_tags', []))
+
+        prominence = settings.get('prominence', {})
+        self.default_prominence = prominence.get('default', 'NEWS_FEED')
+        self.prominence_rules = list(prominence.get('class_contains', {}).items())
+
+    @property
+    def aliases(self):
+        return {self.id, self.name, self.short_name}
+
+    def prominence_for(self, classes):
+        """Prominence of a container given its CSS classes"""
+        class_text = ' '.join(classes).lower()
+        for marker, prominence in self.prominence_rules:
+            if marker in class_text:
+                return prominence
+        return self.default_prominence
+
+    def find_containers(self, soup):
+        """Candidate headline containers in document order"""
+        return soup.find_all(self.container_tags, class_=self.container_classes or None,
+                             limit=self.scan_limit)
+
+    def __repr__(self):
+        return f"Outlet({self.id!r})"
+
+class OutletRegistry:
+    """Ordered collection of outlets with lookup by id, name or short name"""
+
+    def __init__(self, outlets):
+        self.outlets = list(outlets)
+        self._by_alias = {}
+        for outlet in self.outlets:
+            for alias in outlet.aliases:
+                self._by_alias[alias] = outlet
+
+    def __iter__(self):
+        return iter(self.outlets)
+
+    def __len__(self):
+        return len(self.outlets)
+
+    def get(self, name):
+        """Outlet for an id, full name or short name; None if unknown"""
+        return self._by_alias.get(name)
+
+    def url_for(self, name):
+        """Homepage URL for an outlet name, or '' if unknown"""
+        outlet = self.get(name)
+        return outlet.url if outlet else ''
+
+    def source_info(self):
+        """Outlet list in the shape used by the website metadata"""
+        return [{'name': outlet.name, 'url': outlet.url} for outlet in self.outlets]
+
+@lru_cache(maxsize=None)
+def load_registry(path=OUTLETS_FILE):
+    """Load and compile the outlet registry (cached per process)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    defaults = config.get('defaults', {})
+    return OutletRegistry(Outlet(entry, defaults) for entry in config['outlets'])
+
+def extract_headlines(outlet, html, backend=None):
+    """(title, prominence) of each headline on an outlet homepage, text or bytes"""
+    headlines = []
+
+    for title, classes in get_backend(backend).headlines(outlet, html):
+        if len(title) > outlet.min_title_length:  # Filter out short/invalid titles
+            headlines.append((title, outlet.prominence_for(classes)))
+
+    return headlines[:outlet.max_stories]
+
+def extract_stories(outlet, html, backend=None):
+    """Extract headline records from an outlet homepage"""
+    return [Story(title, outlet.id, prominence) for title, prominence in extract_headlines(outlet, html, backend)]
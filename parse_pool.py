@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Process-pool HTML parsing for large page batches
+Parsing is CPU-bound, so threads do not help; batches big enough to pay for
+worker start-up are fanned out to a ProcessPoolExecutor. Workers get
+(outlet id, page) pairs, where a page is text or raw bytes, and send back
+(title, prominence) tuples instead of parse trees, which keeps the traffic
+between processes small. Small batches, single-core machines and platforms
+where a pool cannot start are parsed serially in this process. Workers are
+never forked from this process, which has threads running by then.
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from instrumentation import TRACER
+from outlets import extract_headlines, load_registry
+
+# Batches smaller than this are parsed serially. A run's first pool costs about
+# 0.3s to start (forkserver plus worker imports), while one core parses about
+# 45M chars/s, so 4 workers only win above roughly 20M chars (measured by
+# benchmarks/bench_parse_pool.py): stored-snapshot backfills, not the ~1.5M
+# chars of a daily collection
+MIN_POOL_PAGES = 4
+MIN_POOL_CHARS = 20_000_000
+
+# Chunks per worker: more than one so a worker that drew heavy pages does
+# not leave the others idle at the end, few enough to keep per-task overhead low
+CHUNKS_PER_WORKER = 4
+
+def cpu_count():
+    """CPUs this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        return os.cpu_count() or 1
+
+def chunk_size(pages, workers):
+    """Pages per task handed to a worker"""
+    return max(1, math.ceil(pages / (workers * CHUNKS_PER_WORKER)))
+
+def use_pool(pages, workers, min_chars=MIN_POOL_CHARS):
+    """Whether a batch of (outlet id, page) pairs is worth a process pool"""
+    if workers <= 1 or len(pages) < MIN_POOL_PAGES:
+        return False
+    return sum(len(page or '') for _, page in pages) >= min_chars
+
+def _headlines(outlet_id, page, backend=None):
+    # Runs in the workers: the registry and parser backend are loaded once per process
+    if not page:
+        return []
+    return extract_headlines(load_registry().get(outlet_id), page, backend)
+
+def _parse_serial(pages, backend):
+    results = []
+    for outlet_id, page in pages:
+        with TRACER.span(f"parse:{outlet_id}", kind='outlet', outlet=outlet_id) as span:
+            headlines = _headlines(outlet_id, page, backend)
+            span.set(items=len(headlines))
+        results.append(headlines)
+    return results
+
+def pool_context():
+    """Start method for the workers: never fork
+
+    The collector's threads and pooled HTTP session are live when parsing
+    starts, and forking a threaded process can copy a lock held by another
+    thread. forkserver forks workers from a clean single-threaded server
+    that has this module (and the parser) imported already; spawn is the
+    fallback where forkserver is unavailable.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def _parse_pool(pages, workers, backend):
+    size = chunk_size(len(pages), workers)
+    with TRACER.span('parse:pool', kind='pool', pages=len(pages), workers=workers, chunk_size=size) as span:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as executor:
+            results = list(executor.map(_headlines, *zip(*pages), [backend] * len(pages), chunksize=size))
+        span.set(items=sum(map(len, results)))
+    return results
+
+def parse_pages(pages, workers=None, backend=None, min_chars=MIN_POOL_CHARS):
+    """[(title, prominence), ...] for each (outlet id, page) pair, in input order
+
+    workers defaults to the number of usable CPUs; 0 or 1 parses serially.
+    Batches under min_chars of HTML are parsed serially too (0 always pools).
+    """
+    pages = list(pages)
+    workers = cpu_count() if workers is None else workers
+    workers = min(workers, len(pages))
+    if not use_pool(pages, workers, min_chars):
+        return _parse_serial(pages, backend)
+    try:
+        return _parse_pool(pages, workers, backend)
+    except (BrokenProcessPool, OSError, NotImplementedError) as e:
+        # e.g. no working sem_open in a sandbox, or a worker killed for memory
+        print(f"Warning: process pool failed ({type(e).__name__}: {e}), parsing serially")
+        return _parse_serial(pages, backend)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+In-process pipeline: collect -> parse -> cluster -> score -> enrich -> emit
+Stages hand each other in-memory records instead of JSON files; intermediate
+records are only written out when --dump-dir is given, and every stage reports
+how long it took
+"""
+
+import argparse
+import json
+import os
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import collect_and_generate
+from collect_and_generate import (collect_all, extract_outlet_feed, fetch_page,
+                                  find_cross_outlet_stories, generate_enhanced_story)
+from dedup import SIMILARITY_THRESHOLD
+from history import HistoryStore
+from instrumentation import LOG_DIR, SPANS_PATH, TRACER, profiling
+from momentum import MomentumTracker
+from outlets import load_registry
+from parse_pool import parse_pages
+from replay import FIXTURES_DIR, start_recording, start_replay
+from scoring import score_stories, rank
+from seen_index import SeenIndex
+from static_output import publish_json, write_site
+from story import Story
+from transport import TRANSPORT
+
+OUTPUT_PATH = 'public/viral_russia_news.json'
+TOP_STORIES = 15
+
+def fetch_outlet(outlet, collector=None):
+    """Raw collection record for one outlet: homepage HTML, or stories read from its feed"""
+    # Outlets are fetched in worker threads; the span counts this thread only
+    with TRACER.span(f"collect:{outlet.id}", kind='outlet', scope='thread', outlet=outlet.id) as span:
+        if (collector or outlet.collector) == 'feed' and outlet.feed_url:
+            # Feeds are parsed while they download, so they arrive as stories
+            stories = extract_outlet_feed(outlet)
+            span.set(collector='feed', items=len(stories))
+            return [{'outlet': outlet.id, 'stories': stories}]
+        print(f"Collecting from {outlet.name}...")
+        html = fetch_page(outlet.url)
+        span.set(collector='html', items=1 if html else 0, chars=len(html or ''))
+        return [{'outlet': outlet.id, 'html': html}]
+
+def collect(records, context):
+    """Fetch every outlet concurrently"""
+    args = context['args']
+    extractors = [partial(fetch_outlet, outlet, args.collector) for outlet in load_registry()]
+    records = collect_all(extractors, concurrent=not args.sequential)
+    transfer = TRANSPORT.summary()
+    print(f"Fetched {transfer['requests']} pages: {transfer['wire_bytes']} bytes on the wire, "
+          f"{transfer['decoded_bytes']} bytes decoded")
+    return records
+
+def parse(records, context):
+    """Extract headline records from the fetched pages and mark already-seen ones"""
+    stories = []
+    pages = []
+    for record in records:
+        if 'stories' in record:
+            stories.extend(record['stories'])
+        elif record.get('html'):
+            pages.append((record['outlet'], record['html']))
+    for (outlet_id, _), headlines in zip(pages, parse_pages(pages, context['args'].parse_workers)):
+        stories.extend(Story(title, outlet_id, prominence) for title, prominence in headlines)
+    new_count, carried_over = context['seen'].mark_stories(stories)
+    context['stories'] = stories
+    print(f"Total stories collected: {len(stories)}")
+    print(f"New headlines: {new_count}, carried over from earlier runs: {carried_over}")
+    return stories
+
+def cluster(records, context):
+    """Group headlines carried by several outlets"""
+    clusters = find_cross_outlet_stories(records, threshold=context['args'].similarity)
+    print(f"Cross-outlet stories found: {len(clusters)}")
+    context['clusters'] = clusters
+    return clusters
+
+def score(records, context):
+    """Score clusters by coverage, age and momentum; keep the top stories in rank order"""
+    context['momentum'].observe(records)
+    for story in records:
+        story['recency_hours'] = story['age_hours']
+    scores = score_stories(records, 'cross_outlet')
+    for story, value in zip(records, scores.tolist()):
+        story['viral_score'] = value
+    return [records[i] for i in rank(scores)][:context['args'].top]
+
+def enrich(records, context):
+    """Website story records, with LLM translations and summaries when --enrich llm"""
+    stories = [
+        generate_enhanced_story(rank=i, title=story['title'], outlets=story['outlets'],
+                                viral_score=story['viral_score'])
+        for i, story in enumerate(records, 1)
+    ]
+    if context['args'].enrich == 'llm':
+        # Imported here: analyze_stories needs OpenAI credentials at import time
+        from analyze_stories import enhance_stories_with_ai
+        from llm_cache import LLM_CACHE
+        from translation_memory import TRANSLATION_MEMORY
+        enhance_stories_with_ai(stories, mode=context['args'].enrichment)
+        print(LLM_CACHE.report())
+        print(TRANSLATION_MEMORY.report())
+    return stories
+
+def emit(records, context):
+    """Record the run in the history store, then write the website JSON and shards"""
+    registry = load_registry()
+    metadata = {
+        'generated_at': datetime.now().isoformat(),
+        'collection_period': datetime.now().strftime('%Y-%m-%d'),
+        'total_outlets': len(registry),
+        'outlets': registry.source_info()
+    }
+
+    clusters = context.get('clusters', [])
+    started = time.perf_counter()
+    run_id = context['history'].record_run(
+        f"pipeline-{context['args'].enrich}",
+        context.get('stories', []),
+        clusters,
+        scores={'profile': 'cross_outlet', 'clusters': [cluster['viral_score'] for cluster in clusters]},
+        ranking=records,
+    )
+    print(f"Recorded run {run_id} in history ({(time.perf_counter() - started) * 1000:.1f}ms)")
+
+    # Kept whole for existing consumers; the site itself loads the sharded output
+    output_path = context['args'].output
+    output_changed = publish_json(output_path, {'metadata': metadata, 'stories': records})
+    print(f"Wrote {output_path}" if output_changed else f"{output_path} unchanged")
+    site_changed = write_site(Path(output_path).parent, metadata, records, context['history'])
+    context['publish'] = output_changed or site_changed
+
+    context['seen'].save()
+    context['momentum'].save()
+    return records
+
+STAGES = [
+    ('collect', collect),
+    ('parse', parse),
+    ('cluster', cluster),
+    ('score', score),
+    ('enrich', enrich),
+    ('emit', emit),
+]
+
+def run_pipeline(context, stages=STAGES, dump_dir=None):
+    """Run stages in order, passing each one's records to the next; returns (records, timings)"""
+    records = None
+    timings = {}
+    for number, (name, stage) in enumerate(stages, 1):
+        print(f"\n[{number}/{len(stages)}] {name}")
+        started = time.perf_counter()
+        with TRACER.span(name, kind='stage') as span:
+            records = stage(records, context)
+            span.set(items=len(records))
+        timings[name] = time.perf_counter() - started
+        print(f"  {name}: {timings[name]:.2f}s, {len(records)} records")
+        if dump_dir:
+            dump_path = Path(dump_dir) / f"{number:02d}_{name}.json"
+            dump_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(dump_path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False, indent=2, default=Story.to_dict)
+    return records, timings
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Collect, rank and publish viral Russia news in one process")
+    parser.add_argument('--sequential', action='store_true',
+                        help="fetch outlets one after another instead of in parallel")
+    parser.add_argument('--parse-workers', type=int, metavar='N',
+                        help="processes for HTML parsing (default: one per CPU; 1 parses in this process)")
+    parser.add_argument('--collector', choices=['html', 'feed'],
+                        help="force homepage scraping or feed ingestion for every outlet")
+    parser.add_argument('--similarity', type=float, default=SIMILARITY_THRESHOLD,
+                        help="Jaccard threshold for grouping headlines across outlets")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="bypass the on-disk HTTP cache")
+    parser.add_argument('--cache-max-age', type=float, metavar='SECONDS',
+                        help="serve cached pages younger than this without revalidating")
+    parser.add_argument('--top', type=int, default=TOP_STORIES,
+                        help="number of stories to publish")
+    parser.add_argument('--enrich', choices=['template', 'llm'], default='template',
+                        help="fill summaries from templates, or translate and summarize with the LLM")
+    parser.add_argument('--enrichment', choices=['structured', 'per-field'], default='structured',
+                        help="LLM enrichment mode (with --enrich llm)")
+    parser.add_argument('--output', default=OUTPUT_PATH,
+                        help="website JSON to write")
+    parser.add_argument('--dump-dir', metavar='DIR',
+                        help="write every stage's records to DIR for debugging")
+    offline = parser.add_mutually_exclusive_group()
+    offline.add_argument('--record', nargs='?', const=FIXTURES_DIR, type=Path, metavar='DIR',
+                         help=f"save every fetched page with its headers to DIR (default {FIXTURES_DIR})")
+    offline.add_argument('--replay', nargs='?', const=FIXTURES_DIR, type=Path, metavar='DIR',
+                         help="serve pages recorded in DIR from a local server instead of the network")
+    parser.add_argument('--replay-latency', type=float, default=0.0, metavar='SECONDS',
+                        help="delay every replayed response")
+    parser.add_argument('--replay-jitter', type=float, default=0.0, metavar='SECONDS',
+                        help="add up to this much random delay to every replayed response")
+    parser.add_argument('--replay-error-rate', type=float, default=0.0, metavar='RATE',
+                        help="fraction of replayed requests answered with 503")
+    parser.add_argument('--replay-seed', type=int, default=0,
+                        help="seed for replayed delays and errors")
+    parser.add_argument('--spans', type=Path, default=SPANS_PATH, metavar='PATH',
+                        help="append per-stage and per-outlet spans to this JSON-lines file")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"write cProfile and tracemalloc dumps to {LOG_DIR}/")
+    return parser
+
+def main():
+    args = build_parser().parse_args()
+
+    replay_server = None
+    if args.record:
+        start_recording(TRANSPORT, args.record)
+    elif args.replay:
+        replay_server = start_replay(TRANSPORT, args.replay, latency=args.replay_latency,
+                                     jitter=args.replay_jitter, error_rate=args.replay_error_rate,
+                                     seed=args.replay_seed)
+    # Recording needs full responses, and replays must not depend on cache state
+    if args.no_cache or args.record or args.replay:
+        collect_and_generate.HTTP_CACHE = None
+    elif args.cache_max_age is not None:
+        collect_and_generate.HTTP_CACHE.max_age['*'] = args.cache_max_age
+
+    print("=" * 80)
+    print("VIRAL RUSSIA NEWS - PIPELINE")
+    print("=" * 80)
+
+    run_id = TRACER.open(args.spans)
+    context = {'args': args, 'seen': SeenIndex(), 'history': HistoryStore(), 'momentum': MomentumTracker()}
+    try:
+        with profiling() if args.profile else nullcontext(), TRACER.span('pipeline', kind='run') as span:
+            _, timings = run_pipeline(context, dump_dir=args.dump_dir)
+            span.set(enrich=args.enrich, replay=bool(args.replay))
+    finally:
+        if replay_server is not None:
+            replay_server.stop()
+            print(f"Replay server answered {replay_server.requests} requests ({replay_server.errors} simulated errors)")
+
+    print("\nStage timings:")
+    for name, seconds in timings.items():
+        print(f"  {name:<8} {seconds:8.2f}s")
+    print(f"  {'total':<8} {sum(timings.values()):8.2f}s")
+    print(f"Spans for run {run_id} appended to {args.spans}")
+    publish = context.get('publish', False)
+    print(f"\nPublish needed: {'yes' if publish else 'no (ranked content unchanged)'}")
+    print("=" * 80)
+
+    # Lets the GitHub Actions workflow skip the commit (and the Netlify deploy)
+    if os.environ.get('GITHUB_OUTPUT'):
+        with open(os.environ['GITHUB_OUTPUT'], 'a', encoding='utf-8') as f:
+            f.write(f"publish={'true' if publish else 'false'}\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Record and replay outlet fetches for offline runs
+Record mode saves every page the transport fetches, with its status and
+headers, into a fixtures directory. Replay mode serves those pages from a
+local HTTP server with configurable latency, jitter and error rate, and
+rewrites the transport's URLs to point at it, so the whole collect -> emit
+path runs deterministically without network access.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+FIXTURES_DIR = Path('fixtures/recordings')
+INDEX_NAME = 'index.json'
+
+# Describe the wire, not the page; the server sets its own
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection',
+                   'keep-alive', 'set-cookie', 'strict-transport-security', 'alt-svc'}
+
+def fixture_name(url):
+    """Stable, readable file name for a URL's body"""
+    parsed = urlparse(url)
+    slug = re.sub(r'[^\w.-]+', '_', f"{parsed.netloc}{parsed.path}").strip('_')[:80]
+    return f"{slug}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}.body"
+
+def load_index(fixtures_dir):
+    """{url: {'file', 'status', 'headers'}} of a recording"""
+    path = Path(fixtures_dir) / INDEX_NAME
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+class Recorder:
+    """Saves fetched pages into a fixtures directory (Transport.recorder hook)"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        self.index = load_index(self.fixtures_dir)
+        self._lock = threading.Lock()
+
+    def save(self, url, status, headers, body):
+        name = fixture_name(url)
+        (self.fixtures_dir / name).write_bytes(body)
+        entry = {
+            'file': name,
+            'status': status,
+            'headers': {key: value for key, value in headers.items() if key.lower() not in DROPPED_HEADERS},
+        }
+        with self._lock:
+            self.index[url] = entry
+            tmp_path = self.fixtures_dir / (INDEX_NAME + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.fixtures_dir / INDEX_NAME)
+
+class ReplayServer:
+    """Local HTTP server for a recording, with simulated latency and failures
+
+    latency and jitter are in seconds (each response waits latency plus a
+    uniform share of jitter). error_rate is the chance that a request gets a
+    503 instead of the page. Delays and failures are drawn from seed, the
+    path and how often it was requested, so concurrent runs fail the same way.
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=0.0, jitter=0.0, error_rate=0.0,
+                 seed=0, port=0):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.index = load_index(self.fixtures_dir)
+        if not self.index:
+            raise FileNotFoundError(f"No recording in {self.fixtures_dir} (record one first)")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.port = port
+        self.requests = 0
+        self.errors = 0
+        self._paths = {f"/{entry['file']}": entry for entry in self.index.values()}
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def rewrite(self, url):
+        """Replay URL for a recorded URL; unrecorded URLs get a path that answers 404"""
+        entry = self.index.get(url)
+        name = entry['file'] if entry else fixture_name(url)
+        return f"http://127.0.0.1:{self.port}/{name}"
+
+    def _plan(self, path):
+        """(delay seconds, fail?) for the next request of path"""
+        with self._lock:
+            attempt = self._attempts.get(path, 0)
+            self._attempts[path] = attempt + 1
+            self.requests += 1
+        rng = random.Random(f"{self.seed}:{path}:{attempt}")
+        delay = self.latency + rng.uniform(0, self.jitter)
+        fail = rng.random() < self.error_rate
+        if fail:
+            with self._lock:
+                self.errors += 1
+        return delay, fail
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                delay, fail = replay._plan(self.path)
+                if delay:
+                    time.sleep(delay)
+                entry = replay._paths.get(self.path)
+                if fail or entry is None:
+                    self.send_response(503 if fail else 404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = (replay.fixtures_dir / entry['file']).read_bytes()
+                self.send_response(entry['status'])
+                for key, value in entry['headers'].items():
+                    # send_response already wrote this server's own Date and Server
+                    if key.lower() not in ('date', 'server'):
+                        self.send_header(key, value)
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body, mtime=0)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def start_recording(transport, fixtures_dir=FIXTURES_DIR):
+    """Save everything transport fetches from now on; returns the Recorder"""
+    transport.recorder = Recorder(fixtures_dir)
+    return transport.recorder
+
+def start_replay(transport, fixtures_dir=FIXTURES_DIR, **options):
+    """Serve a recording and send transport's requests to it; returns the running ReplayServer"""
+    server = ReplayServer(fixtures_dir, **options).start()
+    transport.rewrite = server.rewrite
+    print(f"Replaying {len(server.index)} recorded pages from {fixtures_dir} on port {server.port}")
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a recording for manual offline runs")
+    parser.add_argument('fixtures', nargs='?', type=Path, default=FIXTURES_DIR)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = ReplayServer(args.fixtures, args.latency, args.jitter, args.error_rate, port=args.port).start()
+    for url in sorted(server.index):
+        print(f"{server.rewrite(url)}  <-  {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
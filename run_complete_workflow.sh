@@ -33,34 +33,18 @@ log "========================================="
 log "Viral Russia News - Daily Update Workflow"
 log "========================================="
 
-# Step 1: Use existing collected data
+# Step 1: Collect, parse, cluster, score, enrich and emit in one process
 log ""
-log "[1/5] Using existing collected news data..."
-if [ ! -f "data/analyzed_stories.json" ]; then
-    log "  Warning: No analyzed stories found"
-fi
-
-# Step 2: Analyze stories
-log ""
-log "[2/5] Analyzing stories and calculating viral scores..."
-if python3 analyze_stories.py >> "$LOG_FILE" 2>&1; then
-    log "  ✓ Analysis complete"
-else
-    error_exit "Story analysis failed"
-fi
-
-# Step 3: Generate JSON
-log ""
-log "[3/5] Generating JSON file for web deployment..."
-if python3 generate_enhanced_json_fast.py >> "$LOG_FILE" 2>&1; then
-    log "  ✓ JSON generated and validated"
+log "[1/3] Running pipeline (collect -> parse -> cluster -> score -> enrich -> emit)..."
+if python3 pipeline.py --enrich llm >> "$LOG_FILE" 2>&1; then
+    log "  ✓ Pipeline complete"
 else
-    error_exit "JSON generation failed"
+    error_exit "Pipeline failed"
 fi
 
-# Step 4: Verify JSON file
+# Step 2: Verify JSON file
 log ""
-log "[4/5] Verifying JSON file..."
+log "[2/3] Verifying JSON file..."
 if [ -f "public/viral_russia_news.json" ]; then
     SIZE=$(stat -f%z "public/viral_russia_news.json" 2>/dev/null || stat -c%s "public/viral_russia_news.json" 2>/dev/null)
     log "  ✓ File exists (${SIZE} bytes)"
@@ -75,14 +59,15 @@ else
     error_exit "JSON file not found"
 fi
 
-# Step 5: Commit and push to GitHub
+# Step 3: Commit and push to GitHub
 log ""
-log "[5/5] Committing and pushing to GitHub..."
+log "[3/3] Committing and pushing to GitHub..."
 git config user.email "bot@manus.im"
 git config user.name "Manus Bot"
 
-if git add public/viral_russia_news.json; then
-    log "  ✓ File staged"
+# pipeline.py leaves these untouched when the ranked stories did not change
+if git add public/viral_russia_news.json public/manifest.json public/shards; then
+    log "  ✓ Files staged"
 else
     error_exit "Failed to stage file"
 fi
@@ -111,6 +96,7 @@ log "========================================="
 log ""
 log "Summary:"
 log "  - Log file: $LOG_FILE"
+log "  - Stage/outlet spans: $LOG_DIR/spans.jsonl"
 log "  - Site URL: https://viralrussianews.netlify.app/"
 log "  - Netlify will auto-deploy in 1-3 minutes"
 log ""
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Vectorized viral scoring engine
+Story features are loaded into columnar NumPy arrays and every score variant
+defined in scoring.json is computed, and ranked, in one array pass
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from story import normalize_prominence
+
+SCORING_FILE = Path(__file__).resolve().parent / 'scoring.json'
+
+@lru_cache(maxsize=None)
+def load_profiles(path=SCORING_FILE):
+    """Score profiles (weights and lookup tables) keyed by name"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def get_profile(name):
+    return load_profiles()[name]
+
+def lookup(values, table, default, normalize=None):
+    """Map a column of labels through table; only the distinct labels are visited in Python
+
+    normalize, if given, is applied to the table keys and to each distinct label.
+    """
+    labels = np.asarray(values, dtype=object)
+    if labels.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    labels[labels == None] = ''  # noqa: E711  (elementwise comparison)
+    distinct, inverse = np.unique(labels.astype(str), return_inverse=True)
+    if normalize:
+        table = {normalize(key): value for key, value in table.items()}
+        distinct = [normalize(label) for label in distinct]
+    mapped = np.array([table.get(label, default) for label in distinct], dtype=np.int64)
+    return mapped[inverse.reshape(-1)]
+
+def score_columns(profile, size, outlet_count=None, prominence=None,
+                  recency_label=None, recency_hours=None, topic=None, momentum=None):
+    """Scores for `size` stories given feature columns; returns an int64 array"""
+    scores = np.zeros(size, dtype=np.int64)
+
+    if 'outlet_count' in profile:
+        rule = profile['outlet_count']
+        counts = np.asarray(outlet_count, dtype=np.int64)
+        scores += np.minimum(counts * rule['weight'], rule.get('cap', np.iinfo(np.int64).max))
+
+    if 'prominence' in profile:
+        rule = profile['prominence']
+        # 'top_story' and 'TOP_STORY' are the same placement
+        scores += lookup(prominence, rule['scores'], rule['default'], normalize_prominence)
+
+    if 'recency' in profile:
+        rule = profile['recency']
+        if 'constant' in rule:
+            scores += rule['constant']
+        elif 'half_life_hours' in rule:
+            # Continuous decay: full points when fresh, half after each half-life;
+            # unknown ages (NaN) count as unknown_hours, or as infinitely old
+            hours = np.asarray(recency_hours, dtype=np.float64)
+            hours = np.where(np.isnan(hours), rule.get('unknown_hours', np.inf), hours)
+            decay = np.exp2(-np.maximum(hours, 0) / rule['half_life_hours'])
+            scores += rule.get('floor', 0) + np.rint(rule['points'] * decay).astype(np.int64)
+        elif 'labels' in rule:
+            scores += lookup(recency_label, rule['labels'], rule.get('default', 0))
+        else:
+            hours = np.asarray(recency_hours, dtype=np.float64)
+            scores += np.select([hours <= limit for limit, _ in rule['hours']],
+                                [points for _, points in rule['hours']],
+                                default=rule['default'])
+
+    if 'topic' in profile:
+        rule = profile['topic']
+        scores += lookup(topic, rule['scores'], rule.get('default', 0))
+
+    if 'momentum' in profile:
+        # Outlets gained (or lost) since the previous run
+        rule = profile['momentum']
+        change = np.asarray(momentum, dtype=np.int64) * rule['weight']
+        scores += np.clip(change, -rule['cap'], rule['cap'])
+
+    if 'cap' in profile:
+        scores = np.minimum(scores, profile['cap'])
+    return scores
+
+def rank(scores):
+    """Indices ordering scores from highest to lowest, ties kept in input order"""
+    return np.argsort(-np.asarray(scores), kind='stable')
+
+def score_stories(stories, profile_name, **columns):
+    """Score a list of story dicts with the named profile
+
+    Columns not passed explicitly are read from the usual story keys:
+    'count' or 'outlets' for outlet_count, 'prominence', 'recency_label',
+    'recency_hours' (missing = unknown age), 'topic' and 'momentum'.
+    """
+    profile = get_profile(profile_name)
+    if 'outlet_count' in profile and 'outlet_count' not in columns:
+        columns['outlet_count'] = [s['count'] if 'count' in s else len(s['outlets']) for s in stories]
+    if 'prominence' in profile and 'prominence' not in columns:
+        columns['prominence'] = [s.get('prominence') for s in stories]
+    recency = profile.get('recency', {})
+    if 'labels' in recency and 'recency_label' not in columns:
+        columns['recency_label'] = [s.get('recency_label') for s in stories]
+    if ('hours' in recency or 'half_life_hours' in recency) and 'recency_hours' not in columns:
+        columns['recency_hours'] = [s.get('recency_hours', np.nan) for s in stories]
+    if 'topic' in profile and 'topic' not in columns:
+        columns['topic'] = [s.get('topic') for s in stories]
+    if 'momentum' in profile and 'momentum' not in columns:
+        columns['momentum'] = [s.get('momentum', 0) for s in stories]
+    return score_columns(profile, len(stories), **columns)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Persistent index of headlines and URLs seen in earlier runs
+Recent fingerprints are kept as an exact on-disk set; older ones age out into
+a fixed-size Bloom filter, so lookups stay O(1) and memory stays bounded no
+matter how long the history grows
+"""
+
+import hashlib
+import os
+import re
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlsplit
+
+INDEX_DIR = Path('.cache/seen')
+
+# Exact fingerprints kept before the oldest spill into the Bloom filter only
+RECENT_CAPACITY = 200_000
+
+# 2**26 bits = 8 MB; ~0.2% false positives at five million headlines
+BLOOM_BITS = 2 ** 26
+BLOOM_HASHES = 7
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]+')
+TRAILING_TIME_RE = re.compile(r'\d{1,2}:\d{2}$')
+
+def normalize_headline(title):
+    """Lowercase, drop punctuation and a glued-on trailing HH:MM, collapse spaces"""
+    text = TRAILING_TIME_RE.sub('', title.strip())
+    text = PUNCTUATION_RE.sub(' ', text.lower().replace('ё', 'е'))
+    return ' '.join(text.split())
+
+def normalize_url(url):
+    """Host and path without scheme, query, fragment or trailing slash"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}"
+
+def fingerprint(text):
+    """64-bit fingerprint of an already normalized string"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+@lru_cache(maxsize=65536)
+def title_fingerprint(title):
+    """Fingerprint of a headline after normalization (memoized: each run asks several times)"""
+    return fingerprint('t:' + normalize_headline(title))
+
+def story_fingerprints(story):
+    """Fingerprints identifying a story: its headline and, when known, its URL"""
+    fingerprints = [title_fingerprint(story['title'])]
+    url = story.get('url')
+    if url:
+        fingerprints.append(fingerprint('u:' + normalize_url(url)))
+    return fingerprints
+
+class SeenIndex:
+    """Exact recent set plus Bloom filter for long history"""
+
+    def __init__(self, directory=INDEX_DIR, recent_capacity=RECENT_CAPACITY,
+                 bloom_bits=BLOOM_BITS, bloom_hashes=BLOOM_HASHES):
+        self.directory = Path(directory)
+        self.recent_capacity = recent_capacity
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+        self._recent = OrderedDict()
+        self._bloom = bytearray(bloom_bits // 8)
+        self._load()
+
+    def _load(self):
+        recent_path = self.directory / 'recent.bin'
+        bloom_path = self.directory / 'bloom.bin'
+        if recent_path.exists():
+            fingerprints = array('Q')
+            with open(recent_path, 'rb') as f:
+                fingerprints.frombytes(f.read())
+            self._recent = OrderedDict.fromkeys(fingerprints)
+        if bloom_path.exists() and bloom_path.stat().st_size == len(self._bloom):
+            with open(bloom_path, 'rb') as f:
+                self._bloom = bytearray(f.read())
+
+    def save(self):
+        """Write the index atomically"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, payload in (('recent.bin', array('Q', self._recent).tobytes()),
+                              ('bloom.bin', bytes(self._bloom))):
+            tmp_path = self.directory / f"{name}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.directory / name)
+
+    def _bloom_positions(self, fp):
+        h1 = fp & 0xFFFFFFFF
+        h2 = (fp >> 32) | 1
+        return [(h1 + i * h2) % self.bloom_bits for i in range(self.bloom_hashes)]
+
+    def __contains__(self, fp):
+        if fp in self._recent:
+            return True
+        return all(self._bloom[pos >> 3] & (1 << (pos & 7)) for pos in self._bloom_positions(fp))
+
+    def __len__(self):
+        return len(self._recent)
+
+    def add(self, fp):
+        """Record a fingerprint; refreshes its position in the recent set"""
+        if fp in self._recent:
+            self._recent.move_to_end(fp)
+            return
+        self._recent[fp] = None
+        for pos in self._bloom_positions(fp):
+            self._bloom[pos >> 3] |= 1 << (pos & 7)
+        while len(self._recent) > self.recent_capacity:
+            self._recent.popitem(last=False)
+
+    def mark_stories(self, stories):
+        """Set story['is_new'] and record every story; returns (new, carried_over) counts"""
+        # Check everything before recording, so a headline that several outlets
+        # carry in the same run counts as new for all of them
+        story_fps = [story_fingerprints(story) for story in stories]
+        new_count = 0
+        for story, fingerprints in zip(stories, story_fps):
+            story['is_new'] = not any(fp in self for fp in fingerprints)
+            new_count += story['is_new']
+        for fingerprints in story_fps:
+            for fp in fingerprints:
+                self.add(fp)
+        return new_count, len(stories) - new_count
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Sharded static output for the website
+The page loads a small manifest that points at content-hashed shards: the
+current top stories, one list per topic and one archive per day. Shards are
+minified and written once under a name derived from their bytes, so they
+can be cached forever (Netlify compresses them on the fly); only the
+manifest changes between runs. Every file is replaced atomically, and only
+when its ranked content changed, so an unchanged run publishes nothing.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+SHARD_DIR = 'shards'
+MANIFEST_NAME = 'manifest.json'
+
+# Runs whose rankings go into the per-day archives
+PUBLISHED_SOURCES = ('pipeline-template', 'pipeline-llm', 'analyze_stories')
+
+# Fields that change on every run without the ranking changing
+VOLATILE_METADATA = ('generated_at', 'collection_period')
+VOLATILE_STORY_FIELDS = ('date',)
+
+# Published with the stories but recomputed every run from story age and
+# momentum, so they do not count as a change of the ranking
+RESCORED_STORY_FIELDS = ('viral_score', 'vk_engagement', 'prominence')
+
+# Days of per-day archives listed in the manifest
+ARCHIVE_DAYS = 30
+
+def minified(data):
+    """Compact UTF-8 JSON bytes"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _write_atomic(path, body):
+    """Replace path with body; readers see the old file or the new one, never a partial one"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _stable_stories(stories):
+    return [{key: value for key, value in story.items() if key not in VOLATILE_STORY_FIELDS}
+            if isinstance(story, dict) else story for story in stories]
+
+def _stable(data):
+    """data without the volatile fields, for comparing two outputs"""
+    if isinstance(data, dict):
+        data = {key: value for key, value in data.items() if key not in VOLATILE_METADATA}
+        if isinstance(data.get('metadata'), dict):
+            data['metadata'] = _stable(data['metadata'])
+        if isinstance(data.get('stories'), list):
+            data['stories'] = _stable_stories(data['stories'])
+    return data
+
+def _ranked(data):
+    """_stable(data) without the rescored story fields: what the ranking consists of"""
+    data = _stable(data)
+    if isinstance(data, dict) and isinstance(data.get('stories'), list):
+        data['stories'] = [{key: value for key, value in story.items() if key not in RESCORED_STORY_FIELDS}
+                           if isinstance(story, dict) else story for story in data['stories']]
+    return data
+
+def content_hash(data):
+    """SHA-256 of data's canonical JSON, ignoring volatile metadata and rescored story fields"""
+    canonical = json.dumps(_ranked(data), ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def publish_json(path, data, indent=2):
+    """Atomically write data to path unless only volatile metadata differs; returns True if written
+
+    indent=None writes compact JSON, without spaces after separators.
+    """
+    path = Path(path)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    except (OSError, ValueError):
+        current = None
+    if current is not None and content_hash(current) == content_hash(data):
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    separators = (',', ':') if indent is None else None
+    _write_atomic(path, (json.dumps(data, ensure_ascii=False, indent=indent, separators=separators) + '\n').encode('utf-8'))
+    return True
+
+def write_shard(site_dir, name, data):
+    """Write one shard; returns its site-relative URL
+
+    Identical content maps to the same file, so unchanged shards are not rewritten.
+    """
+    body = minified(data)
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    url = f"{SHARD_DIR}/{name}.{digest}.json"
+    path = Path(site_dir) / url
+    if path.exists():
+        return url
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(path, body)
+    return url
+
+def _unchanged_shard(site_dir, url, stories):
+    """Whether the shard at url holds stories up to their rescored fields"""
+    try:
+        with open(Path(site_dir) / url, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return content_hash({'stories': current}) == content_hash({'stories': stories})
+
+def group_by_topic(stories):
+    """{topic: stories} in rank order"""
+    topics = {}
+    for story in stories:
+        topics.setdefault(story.get('topic') or 'Other', []).append(story)
+    return topics
+
+def _slug(label):
+    return ''.join(ch if ch.isalnum() else '-' for ch in label.lower()).strip('-') or 'other'
+
+def _referenced(manifest):
+    """Shard URLs a manifest points at"""
+    if not manifest:
+        return set()
+    return {manifest['top'], *manifest.get('topics', {}).values(), *manifest.get('days', {}).values()}
+
+def read_manifest(site_dir):
+    try:
+        with open(Path(site_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def prune_shards(site_dir, keep):
+    """Delete shards whose URL is not in keep; returns how many"""
+    shard_dir = Path(site_dir) / SHARD_DIR
+    removed = 0
+    for path in shard_dir.glob('*.json'):
+        if f"{SHARD_DIR}/{path.name}" in keep:
+            continue
+        path.unlink()
+        removed += 1
+    # Precompressed siblings written by earlier versions are no longer served
+    for path in [*shard_dir.glob('*.json.gz'), *shard_dir.glob('*.json.br')]:
+        path.unlink()
+    return removed
+
+def write_site(site_dir, metadata, stories, history=None, sources=PUBLISHED_SOURCES, archive_days=ARCHIVE_DAYS):
+    """Write shards for this run and swap in the new manifest; returns True if it changed
+
+    history: HistoryStore supplying the per-day archives; record the run first so
+    today's archive includes it. sources limits the archives to those run sources.
+    When the ranking is unchanged, the previous top and topic shards are kept
+    (only their rescored fields would differ); the day archives are always
+    brought up to date, each also kept while its own ranking is unchanged. When no shard changed, the previous manifest is left
+    as it is.
+    """
+    site_dir = Path(site_dir)
+    previous = read_manifest(site_dir)
+    ranking = content_hash({'metadata': metadata, 'stories': stories})
+
+    # Shards hold only stable content, so an unchanged ranking maps to the
+    # same files; the manifest carries this run's volatile metadata
+    manifest = {key: metadata[key] for key in VOLATILE_METADATA if key in metadata}
+    manifest['ranking'] = ranking
+    current = [previous['top'], *previous.get('topics', {}).values()] if previous else []
+    if previous and previous.get('ranking') == ranking and all((site_dir / url).exists() for url in current):
+        print("Top and topic shards unchanged (same ranking)")
+        manifest['top'] = previous['top']
+        manifest['topics'] = dict(previous.get('topics', {}))
+    else:
+        manifest['top'] = write_shard(site_dir, 'top', {'metadata': _stable(metadata), 'stories': _stable_stories(stories)})
+        manifest['topics'] = {}
+        for topic, topic_stories in group_by_topic(stories).items():
+            manifest['topics'][topic] = write_shard(site_dir, f"topic-{_slug(topic)}", _stable_stories(topic_stories))
+    manifest['days'] = {}
+
+    if history is not None:
+        since = (datetime.now(timezone.utc) - timedelta(days=archive_days - 1)).strftime('%Y-%m-%d')
+        days = history.daily_rankings(since, sources)
+        previous_days = previous.get('days', {}) if previous else {}
+        for day in sorted(days, reverse=True):
+            # A later run of the same day with the same ranking keeps its archive
+            url = previous_days.get(day)
+            if not (url and _unchanged_shard(site_dir, url, days[day])):
+                url = write_shard(site_dir, f"day-{day}", _stable_stories(days[day]))
+            manifest['days'][day] = url
+
+    if not publish_json(site_dir / MANIFEST_NAME, manifest, indent=None):
+        print(f"{MANIFEST_NAME} unchanged")
+        return False
+
+    # A page that loaded the previous manifest may still be fetching its shards
+    removed = prune_shards(site_dir, _referenced(manifest) | _referenced(previous))
+    print(f"Wrote {MANIFEST_NAME}: {1 + len(manifest['topics']) + len(manifest['days'])} shards, "
+          f"pruned {removed}")
+    return True
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for the data/*_stories.txt dumps
+Reads line by line and yields one Story per entry as soon as the next entry
+starts, so archive dumps of any size are read in constant memory. Understands
+every entry form the dumps use: numbered ('1. ...'), bulleted ('- ...') and
+'Title:' blocks, with indented Time/URL/Prominence/Category/Tag lines, and
+section headers ('NEWS FEED (Recent):') as prominence hints.
+"""
+
+import re
+
+from story import Story
+
+NUMBERED_RE = re.compile(r'^\d{1,4}\.\s+(\S.*)$')
+BULLET_RE = re.compile(r'^[-•*]\s+(\S.*)$')
+TITLE_RE = re.compile(r'^Title:\s*(\S.*)$')
+FIELD_RE = re.compile(r'^(Time|URL|Prominence|Category|Tag|Related):\s*(.*)$')
+# Upper-case section names ending in a colon, e.g. 'TOP STORY:', 'ГЛАВНОЕ (Main Stories):'
+SECTION_RE = re.compile(r'^[A-ZА-ЯЁ][A-ZА-ЯЁ0-9 ]*[A-ZА-ЯЁ0-9](?:\s*\(.*\))?:$')
+
+# Section names to prominence, first match wins
+SECTION_PROMINENCE = [
+    (re.compile(r'TOP STOR'), 'top_story'),
+    (re.compile(r'FEATURED|SPECIAL|NOTABLE|ВАЖНОЕ|ПОПУЛЯРНОЕ|ВЫБОР РЕДАКЦИИ|КАРТИНА ДНЯ|МЕДИА'), 'featured'),
+    (re.compile(r'NEWS FEED|TICKER|RECENT|LATEST|НОВОСТИ'), 'news_feed'),
+    (re.compile(r'MAIN|ГЛАВНОЕ'), 'main'),
+]
+
+# Entries outside any recognised section
+DEFAULT_PROMINENCE = 'main'
+
+def section_prominence(name):
+    """Prominence hinted by a section name; DEFAULT_PROMINENCE if it hints none"""
+    for pattern, prominence in SECTION_PROMINENCE:
+        if pattern.search(name):
+            return prominence
+    return DEFAULT_PROMINENCE
+
+def _story(entry, outlet):
+    return Story(entry['title'], outlet, entry['prominence'], url=entry.get('url'),
+                 time=entry.get('time'), category=entry.get('category') or entry.get('tag'))
+
+def iter_stories(lines, outlet):
+    """Yield a Story for every entry in an iterable of stories-file lines
+
+    An explicit 'Prominence:' line wins over the section's hint; 'Category:'
+    wins over 'Tag:'.
+    """
+    entry = None
+    hint = DEFAULT_PROMINENCE
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        match = FIELD_RE.match(line)
+        if match:
+            if entry is not None:
+                key, value = match.group(1).lower(), match.group(2).strip()
+                if key != 'related' and value:
+                    entry[key] = value
+            continue
+
+        match = NUMBERED_RE.match(line) or BULLET_RE.match(line) or TITLE_RE.match(line)
+        if match:
+            if entry is not None:
+                yield _story(entry, outlet)
+            entry = {'title': match.group(1).strip(), 'prominence': hint}
+            continue
+
+        if SECTION_RE.match(line):
+            if entry is not None:
+                yield _story(entry, outlet)
+                entry = None
+            hint = section_prominence(line.upper())
+        # Anything else (the file header, stray notes) is not an entry
+
+    if entry is not None:
+        yield _story(entry, outlet)
+
+def read_stories(path, outlet):
+    """Lazily yield the Stories of one stories file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_stories(f, outlet)
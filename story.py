@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Compact story record shared by loaders, extractors, scorers and emitters
+Outlet, prominence and topic are stored as enum members instead of repeated
+strings, and the bilingual enrichment fields only take space once set.
+Stories still answer story['title'] / story.get('url') like the dicts they
+replace, so existing code keeps working unchanged.
+"""
+
+import sys
+from enum import Enum, IntEnum
+from functools import lru_cache
+
+class Prominence(Enum):
+    """Where a story was placed on the outlet's page"""
+    # Values are the labels the data/*_stories.txt dumps and data/viral_stories.json use
+    TOP_STORY = 'top_story'
+    FEATURED = 'featured'
+    MAIN = 'main'
+    NEWS_FEED = 'news_feed'
+
+    @classmethod
+    def parse(cls, value):
+        """Member for any spelling ('top_story', 'Top story', Prominence.TOP_STORY); None if unknown"""
+        if value is None or isinstance(value, cls):
+            return value
+        return cls.__members__.get('_'.join(str(value).upper().replace('-', ' ').split()))
+
+class Topic(Enum):
+    """Topic labels of the 'topic' taxonomy dimension"""
+    UKRAINE_CONFLICT = 'ukraine_conflict'
+    INTERNATIONAL = 'international'
+    DOMESTIC_POLITICS = 'domestic_politics'
+    ECONOMY = 'economy'
+    SOCIETY = 'society'
+    CULTURE = 'culture'
+
+    @classmethod
+    def parse(cls, value):
+        if value is None or isinstance(value, cls):
+            return value
+        try:
+            return cls(str(value).lower())
+        except ValueError:
+            return None
+
+def normalize_prominence(value):
+    """Canonical prominence spelling ('top_story'), or the value unchanged if unknown"""
+    member = Prominence.parse(value)
+    return member.value if member else value
+
+_unknown_prominence = set()
+
+def parse_prominence(value):
+    """Prominence member for value; an unknown label is kept as given and reported once"""
+    member = Prominence.parse(value)
+    if member is not None or not value:
+        return member
+    value = sys.intern(str(value))
+    if value not in _unknown_prominence:
+        _unknown_prominence.add(value)
+        print(f"Warning: unknown prominence {value!r}, kept as is")
+    return value
+
+@lru_cache(maxsize=None)
+def outlet_enum():
+    """IntEnum with one member per registry outlet, in registry order"""
+    from outlets import load_registry  # outlets imports this module
+
+    return IntEnum('OutletId', [outlet.id.upper() for outlet in load_registry()])
+
+def outlet_id(name):
+    """OutletId for an outlet id, full name or short name ('RT' and 'RT Russian' agree)"""
+    from outlets import load_registry
+
+    OutletId = outlet_enum()
+    if isinstance(name, OutletId):
+        return name
+    outlet = load_registry().get(name)
+    if outlet is None:
+        raise KeyError(f"Unknown outlet: {name!r}")
+    return OutletId[outlet.id.upper()]
+
+def outlet_for(code):
+    """Registry Outlet for an OutletId"""
+    from outlets import load_registry
+
+    return load_registry().outlets[code - 1]
+
+# Enrichment fields, allocated together on first write
+BILINGUAL_FIELDS = ('title_en', 'title_ru', 'summary', 'summary_ru', 'why_trending', 'why_trending_ru')
+
+class Story:
+    """One headline from one outlet"""
+
+    __slots__ = ('title', 'outlet', 'prominence', 'topic', 'url', 'time', 'category',
+                 'published', 'is_new', 'viral_score', '_bilingual')
+
+    # Plain attributes reachable through story[key]
+    _PLAIN = ('title', 'url', 'time', 'category', 'published', 'is_new', 'viral_score')
+
+    def __init__(self, title, outlet, prominence=None, topic=None, url=None, time=None,
+                 category=None, published=None):
+        self.title = title
+        self.outlet = outlet_id(outlet)
+        self.prominence = parse_prominence(prominence)
+        self.topic = Topic.parse(topic)
+        self.url = url or None
+        # Short labels repeat across stories; share one copy of each
+        self.time = sys.intern(time) if time else None
+        self.category = sys.intern(category) if category else None
+        self.published = published or None
+        self.is_new = None
+        self.viral_score = None
+        self._bilingual = None
+
+    @property
+    def outlet_name(self):
+        """Full outlet name ('RT Russian')"""
+        return outlet_for(self.outlet).name
+
+    @property
+    def outlet_short_name(self):
+        """Short outlet name ('RT')"""
+        return outlet_for(self.outlet).short_name
+
+    def _get(self, key):
+        if key in self._PLAIN:
+            return getattr(self, key)
+        if key == 'outlet':
+            return self.outlet_short_name
+        if key == 'source':
+            return self.outlet_name
+        if key in ('prominence', 'topic'):
+            member = getattr(self, key)
+            return member.value if isinstance(member, Enum) else member
+        if key in BILINGUAL_FIELDS:
+            return self._bilingual.get(key) if self._bilingual else None
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        value = self._get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            value = self._get(key)
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __setitem__(self, key, value):
+        if key in self._PLAIN:
+            setattr(self, key, value)
+        elif key in ('outlet', 'source'):
+            self.outlet = outlet_id(value)
+        elif key == 'prominence':
+            self.prominence = parse_prominence(value)
+        elif key == 'topic':
+            self.topic = Topic.parse(value)
+        elif key in BILINGUAL_FIELDS:
+            if self._bilingual is None:
+                self._bilingual = {}
+            self._bilingual[key] = value
+        else:
+            raise KeyError(f"Story has no field {key!r}")
+
+    def update(self, fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        value = self.get(key)
+        if value is None:
+            self[key] = value = default
+        return value
+
+    def to_dict(self):
+        """Plain dict of the fields that are set, with enums as their labels"""
+        keys = ('title', 'outlet', 'source', 'prominence', 'topic') + self._PLAIN[1:] + BILINGUAL_FIELDS
+        return {key: value for key in keys if (value := self.get(key)) is not None}
+
+    def __eq__(self, other):
+        if not isinstance(other, Story):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Story({self.title[:40]!r}, {self.outlet.name}, {getattr(self.prominence, 'name', self.prominence)})"
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Shared keyword taxonomy for topic, category and tag classification
+All keyword lists are compiled into one trie-shaped regex, so a single scan
+of the title finds every keyword and answers all classifications at once
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Each dimension is an ordered list of (label, keywords). For single-label
+# dimensions the first rule with a matching keyword wins, as in an if/elif
+# chain; 'tags' collects every matching rule. Keywords match as substrings of
+# the lowercased title.
+TAXONOMY = {
+    # analyze_stories.classify_topic
+    'topic': {
+        'rules': [
+            ('ukraine_conflict', ['украин', 'всу', 'зеленск', 'киев', 'донбасс', 'красноармейск', 'спецоперац', 'сво']),
+            ('international', ['сша', 'трамп', 'байден', 'европ', 'венесуэл', 'путин', 'лавров', 'nato', 'нато']),
+            ('domestic_politics', ['путин', 'совбез', 'правительств', 'минобороны', 'дума', 'закон']),
+            ('economy', ['экономик', 'рубл', 'банк', 'цб', 'ставк', 'инфляц', 'налог', 'кредит']),
+        ],
+        'default': 'society',
+    },
+    # generate_json.get_category
+    'category': {
+        'rules': [
+            ('International', ['трамп', 'сша', 'нато', 'европ', 'запад', 'нигери']),
+            ('Ukraine Conflict', ['украин', 'всу', 'сво', 'зеленский', 'купянск', 'покровск', 'красноармейск']),
+            ('Russia', ['путин', 'россия', 'рф', 'мвф', 'премия']),
+            ('Military & Defense', ['оружи', 'военн', 'армия', 'тэс', 'удар', 'экраноплан', 'tomahawk']),
+        ],
+        'default': 'General News',
+    },
+    # collect_and_generate.generate_enhanced_story
+    'news_topic': {
+        'rules': [
+            ('Emergency', ['взрыв', 'погиб', 'авария', 'пожар', 'explosion', 'accident']),
+            ('Politics', ['путин', 'трамп', 'политик', 'putin', 'trump', 'politics']),
+            ('Military', ['армия', 'военн', 'дрон', 'military', 'army', 'drone']),
+            ('Economy', ['эконом', 'санкц', 'economy', 'sanctions']),
+        ],
+        'default': 'Society',
+    },
+    # generate_enhanced_json_fast.generate_tags
+    'tags': {
+        'rules': [
+            ('trump', ['трамп']),
+            ('putin', ['путин']),
+        ],
+        'multi': True,
+    },
+}
+
+Classification = namedtuple('Classification', ['topic', 'category', 'news_topic', 'tags'])
+
+def _trie_pattern(keywords):
+    """Regex alternation shaped like a trie; matches the longest keyword at a position"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional suffix: prefer the longer keyword, fall back to this one
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+class CompiledTaxonomy:
+    """TAXONOMY compiled into one scanner plus keyword -> rule lookups"""
+
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        rule_hits = {}
+        for dimension, spec in taxonomy.items():
+            for index, (_, keywords) in enumerate(spec['rules']):
+                for keyword in keywords:
+                    rule_hits.setdefault(keyword, set()).add((dimension, index))
+
+        # The scanner reports the longest keyword starting at each position;
+        # every shorter keyword starting there is one of its prefixes
+        self._hits = {}
+        for keyword in rule_hits:
+            hits = set()
+            for end in range(1, len(keyword) + 1):
+                hits |= rule_hits.get(keyword[:end], set())
+            self._hits[keyword] = frozenset(hits)
+
+        self._scanner = re.compile(f'(?=({_trie_pattern(rule_hits)}))')
+        # Headlines share few distinct keyword sets, so resolve each set once
+        self._resolved = {}
+        self._max_resolved = 65536
+
+    def matched_rules(self, title):
+        """Set of (dimension, rule index) pairs whose keywords occur in title"""
+        hits = set()
+        for keyword in self._scanner.findall(title.lower()):
+            hits |= self._hits[keyword]
+        return hits
+
+    def classify(self, title):
+        """Topic, category, news topic and tags of a title from one scan"""
+        keywords = frozenset(self._scanner.findall(title.lower()))
+        result = self._resolved.get(keywords)
+        if result is None:
+            result = self._resolve(keywords)
+            if len(self._resolved) >= self._max_resolved:
+                self._resolved.clear()
+            self._resolved[keywords] = result
+        return result
+
+    def _resolve(self, keywords):
+        matched = {dimension: [] for dimension in self.taxonomy}
+        for keyword in keywords:
+            for dimension, index in self._hits[keyword]:
+                matched[dimension].append(index)
+
+        labels = {}
+        for dimension, spec in self.taxonomy.items():
+            indices = sorted(matched[dimension])
+            if spec.get('multi'):
+                labels[dimension] = tuple(spec['rules'][i][0] for i in indices)
+            elif indices:
+                labels[dimension] = spec['rules'][indices[0]][0]
+            else:
+                labels[dimension] = spec['default']
+        return Classification(**labels)
+
+@lru_cache(maxsize=None)
+def compiled_taxonomy():
+    """The shared taxonomy, compiled once per process"""
+    return CompiledTaxonomy(TAXONOMY)
+
+def classify(title):
+    """Classify a headline in every taxonomy dimension"""
+    return compiled_taxonomy().classify(title)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Absolute timestamps from the time strings outlets print next to headlines
+Handles '08:00 Nov 1', '31 октября, 23:00', '23:01, 31 октября',
+'Вчера, 23:22', '17 минут назад (17 minutes ago)' and bare 'HH:MM'. The
+pattern matching is memoized per string; only the cheap resolution against
+the reference time runs for every call.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+# Outlets print Moscow time (UTC+3, no DST since 2014)
+MSK = timezone(timedelta(hours=3), 'MSK')
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'январ': 1, 'феврал': 2, 'март': 3, 'апрел': 4, 'ма': 5, 'июн': 6,
+    'июл': 7, 'август': 8, 'сентябр': 9, 'октябр': 10, 'ноябр': 11, 'декабр': 12,
+}
+MONTH_PREFIXES = sorted(MONTHS, key=len, reverse=True)
+
+TIME_RE = re.compile(r'\b(\d{1,2}):(\d{2})\b')
+# 'D month' or 'Mon D'; a day number never directly follows a clock time's colon
+DATE_RE = re.compile(r'(?:(?<![:\d])(\d{1,2})\s+([a-zа-яё]+)|\b([a-z]{3})[a-z]*\.?\s+(\d{1,2})\b)')
+AGO_RE = re.compile(r'(\d+)?\s*(минут|мин|minute|min|час|hour)')
+
+def _month(word):
+    """Month number for an English or Russian (genitive) month name; None if not a month"""
+    word = word.lower()
+    for prefix in MONTH_PREFIXES:
+        if word.startswith(prefix):
+            # 'ма' must be the whole stem: мая, май (not март, already matched)
+            if prefix == 'ма' and word not in ('мая', 'май'):
+                continue
+            return MONTHS[prefix]
+    return None
+
+@lru_cache(maxsize=4096)
+def parse_spec(text):
+    """Reference-independent reading of a time string
+
+    ('ago', minutes) | ('day', days_back, hour, minute) | ('date', month, day, hour, minute) | None
+    """
+    if not text:
+        return None
+    text = text.strip().lower()
+
+    if 'назад' in text or 'ago' in text:
+        match = AGO_RE.search(text)
+        if match:
+            amount = int(match.group(1) or 1)
+            return ('ago', amount * 60 if match.group(2) in ('час', 'hour') else amount)
+
+    time_match = TIME_RE.search(text)
+    hour, minute = (int(time_match.group(1)), int(time_match.group(2))) if time_match else (None, None)
+    if hour is not None and (hour > 23 or minute > 59):
+        return None
+
+    for match in DATE_RE.finditer(text):
+        if match.group(1):
+            day, month = int(match.group(1)), _month(match.group(2))
+        else:
+            month, day = _month(match.group(3)), int(match.group(4))
+        if month and 1 <= day <= 31:
+            return ('date', month, day, hour, minute)
+
+    if 'вчера' in text or 'yesterday' in text:
+        return ('day', 1, hour, minute)
+    if 'сегодня' in text or 'today' in text or hour is not None:
+        return ('day', 0, hour, minute)
+    return None
+
+def parse_timestamp(text, now=None):
+    """Absolute Moscow-time datetime for a time string, or None if unrecognised
+
+    Strings without a year resolve to the latest matching date that is not
+    in the future; strings without a clock time get now's clock time.
+    """
+    spec = parse_spec(text)
+    if spec is None:
+        return None
+    now = (now or datetime.now(MSK)).astimezone(MSK)
+
+    if spec[0] == 'ago':
+        return now - timedelta(minutes=spec[1])
+
+    if spec[0] == 'day':
+        _, days_back, hour, minute = spec
+        moment = now - timedelta(days=days_back)
+        if hour is not None:
+            moment = moment.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            # A bare clock time later than now was yesterday's
+            if days_back == 0 and moment > now:
+                moment -= timedelta(days=1)
+        return moment
+
+    _, month, day, hour, minute = spec
+    if hour is None:
+        hour, minute = now.hour, now.minute
+    for year in (now.year, now.year - 1):
+        try:
+            moment = datetime(year, month, day, hour, minute, tzinfo=MSK)
+        except ValueError:  # 29 February
+            continue
+        # Allow an hour of clock skew before deciding the date is last year's
+        if moment <= now + timedelta(hours=1):
+            return moment
+    return None
+
+def age_hours(text, now=None):
+    """Hours between a time string and now; None if unrecognised"""
+    now = now or datetime.now(MSK)
+    moment = parse_timestamp(text, now)
+    if moment is None:
+        return None
+    return max(0.0, (now - moment).total_seconds() / 3600)
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 import json
 from openai import OpenAI
+from llm_cache import cached_completion, LLM_CACHE
+from translation_memory import TRANSLATION_MEMORY
+from static_output import publish_json
 
 # Initialize OpenAI client (API key is already in environment)
 client = OpenAI()
@@ -18,15 +21,27 @@ for i, story in enumerate(data['stories'], 1):
     # Get Russian title
     russian_title = story['title']
     
-    # Translate title
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": "You are a professional translator. Translate the following Russian news headline to English. Provide only the translation, no explanations."},
-            {"role": "user", "content": russian_title}
-        ]
-    )
-    english_title = response.choices[0].message.content.strip()
+    # English headlines need no translation; otherwise reuse an earlier
+    # translation of this or a near-identical headline
+    english_title = TRANSLATION_MEMORY.english_title(russian_title)
+    if english_title is None:
+        remembered = TRANSLATION_MEMORY.lookup(russian_title, ['title_en'])
+        english_title = remembered and remembered['title_en']
+    if english_title:
+        TRANSLATION_MEMORY.count_calls(avoided=1)
+    else:
+        # Translate title
+        response = cached_completion(
+            client,
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": "You are a professional translator. Translate the following Russian news headline to English. Provide only the translation, no explanations."},
+                {"role": "user", "content": russian_title}
+            ]
+        )
+        english_title = response.strip()
+        TRANSLATION_MEMORY.count_calls(made=1)
+        TRANSLATION_MEMORY.store(russian_title, {'title_en': english_title})
     
     # Update story
     story['title_ru'] = russian_title
@@ -40,7 +55,9 @@ for i, story in enumerate(data['stories'], 1):
     print(f"  EN: {english_title[:60]}...")
 
 # Write updated JSON
-with open('public/viral_russia_news.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
+if not publish_json('public/viral_russia_news.json', data):
+    print("public/viral_russia_news.json unchanged")
 
+print(LLM_CACHE.report())
+print(TRANSLATION_MEMORY.report())
 print("\nTranslation complete!")
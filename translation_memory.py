@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Translation memory for headlines, summaries and 'why trending' texts
+Every enriched Russian headline is stored with its English fields; later runs
+reuse them for the same headline or a lightly reworded one, found through a
+character n-gram inverted index, instead of asking the LLM again
+"""
+
+import json
+import re
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from dedup import jaccard, shingles
+from seen_index import normalize_headline
+
+MEMORY_PATH = Path('.cache/translations.sqlite3')
+
+# Character 4-gram Jaccard at or above which two headlines share a translation
+REUSE_THRESHOLD = 0.85
+
+# Least-recently-used entries beyond this count are evicted
+MAX_ENTRIES = 20_000
+
+# Headlines with less than this share of Cyrillic letters are treated as English
+CYRILLIC_SHARE = 0.3
+
+CYRILLIC_RE = re.compile(r'[а-яё]', re.IGNORECASE)
+LETTER_RE = re.compile(r'[^\W\d_]')
+NUMBER_RE = re.compile(r'\d+')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS translations (
+    key TEXT PRIMARY KEY,
+    title_ru TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used);
+'''
+
+def is_english(title):
+    """True if a headline has (almost) no Cyrillic letters"""
+    letters = LETTER_RE.findall(title)
+    if not letters:
+        return False
+    return len(CYRILLIC_RE.findall(title)) / len(letters) < CYRILLIC_SHARE
+
+class TranslationMemory:
+    """SQLite-backed translation memory with an in-memory fuzzy index"""
+
+    def __init__(self, path=MEMORY_PATH, threshold=REUSE_THRESHOLD, max_entries=MAX_ENTRIES):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.stats = Counter()
+        self._connection = None
+        self._entries = None  # key -> (fields, shingle set, numbers)
+        self._postings = defaultdict(set)
+
+    def _connect(self):
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        for key, fields in self._connect().execute('SELECT key, fields FROM translations'):
+            self._index(key, json.loads(fields))
+
+    def _index(self, key, fields):
+        grams = shingles(key, 'char')
+        self._entries[key] = (fields, grams, NUMBER_RE.findall(key))
+        for gram in grams:
+            self._postings[gram].add(key)
+
+    def lookup(self, title_ru, fields):
+        """Stored values for all of fields from the same or a near-identical headline, else None"""
+        self._load()
+        key = normalize_headline(title_ru)
+        entry = self._entries.get(key)
+        if entry and all(entry[0].get(field) for field in fields):
+            self._touch(key)
+            self.stats['exact'] += 1
+            return {field: entry[0][field] for field in fields}
+
+        grams = shingles(key, 'char')
+        numbers = NUMBER_RE.findall(key)
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self._postings.get(gram, ()))
+        # Jaccard >= t needs at least t * |query| shared grams
+        minimum = self.threshold * len(grams)
+        best, best_score = None, self.threshold
+        for candidate, shared in overlap.items():
+            if shared < minimum:
+                continue
+            stored, candidate_grams, candidate_numbers = self._entries[candidate]
+            # A changed figure (casualties, rates, dates) is a different fact
+            if candidate_numbers != numbers or not all(stored.get(field) for field in fields):
+                continue
+            score = jaccard(grams, candidate_grams)
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is None:
+            return None
+        self._touch(best)
+        self.stats['fuzzy'] += 1
+        stored = self._entries[best][0]
+        return {field: stored[field] for field in fields}
+
+    def store(self, title_ru, fields):
+        """Remember fields for a headline, merged with anything already stored for it"""
+        self._load()
+        key = normalize_headline(title_ru)
+        merged = dict(self._entries[key][0]) if key in self._entries else {}
+        merged.update({field: value for field, value in fields.items() if value})
+        self._index(key, merged)
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO translations (key, title_ru, fields, last_used) VALUES (?, ?, ?, ?)',
+                (key, title_ru, json.dumps(merged, ensure_ascii=False), time.time()))
+            evicted = connection.execute(
+                'SELECT key FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?',
+                (self.max_entries,)).fetchall()
+            connection.executemany('DELETE FROM translations WHERE key = ?', evicted)
+        for (old_key,) in evicted:
+            self._forget(old_key)
+
+    def _touch(self, key):
+        connection = self._connect()
+        with connection:
+            connection.execute('UPDATE translations SET last_used = ? WHERE key = ?', (time.time(), key))
+
+    def _forget(self, key):
+        _, grams, _ = self._entries.pop(key)
+        for gram in grams:
+            self._postings[gram].discard(key)
+
+    def english_title(self, title):
+        """The headline itself if it is already in English, else None"""
+        if is_english(title):
+            self.stats['english'] += 1
+            return title
+        return None
+
+    def count_calls(self, made=0, avoided=0):
+        """Tally LLM calls made and avoided, for report()"""
+        self.stats['calls_made'] += made
+        self.stats['calls_avoided'] += avoided
+
+    def report(self):
+        """One-line reuse summary"""
+        made, avoided = self.stats['calls_made'], self.stats['calls_avoided']
+        total = made + avoided
+        share = (avoided / total * 100) if total else 0
+        return (f"Translation memory: {self.stats['exact']} exact, {self.stats['fuzzy']} fuzzy, "
+                f"{self.stats['english']} already English; {avoided} of {total} LLM calls avoided ({share:.0f}%)")
+
+TRANSLATION_MEMORY = TranslationMemory()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP transport used by fetch_page
+One shared keep-alive session, compressed transfer, streamed bodies with a
+hard size cap, and charset-aware decoding with per-request metrics
+"""
+
+import codecs
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import TRACER
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes 'br' only when this is installed)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+# Homepages are a few hundred KB; anything far beyond that is not a news page
+MAX_BODY_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+POOL_SIZE = 16
+
+CHARSET_HEADER_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+CHARSET_META_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+@dataclass
+class FetchMetrics:
+    """Timing and size figures for one request"""
+    url: str
+    status: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    ttfb: float = 0.0
+    total_time: float = 0.0
+    truncated: bool = False
+
+@dataclass
+class FetchResult:
+    """Response status, headers and raw body with the charset used to decode it"""
+    status: int
+    headers: dict
+    body: bytes
+    encoding: str
+    metrics: FetchMetrics = field(repr=False, default=None)
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding, errors='replace')
+
+def detect_encoding(content_type, body):
+    """Pick the declared charset from the header, else from a <meta> tag, else UTF-8"""
+    for match in (CHARSET_HEADER_RE.search(content_type or ''),
+                  CHARSET_META_RE.search(body[:4096])):
+        if match:
+            name = match.group(1)
+            if isinstance(name, bytes):
+                name = name.decode('ascii', errors='ignore')
+            try:
+                return codecs.lookup(name).name
+            except LookupError:
+                continue
+    return 'utf-8'
+
+class Transport:
+    """Shared pooled session that records metrics for every request"""
+
+    def __init__(self, pool_size=POOL_SIZE, max_body_bytes=MAX_BODY_BYTES):
+        self.max_body_bytes = max_body_bytes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        self.history = []
+        self._lock = threading.Lock()
+        # Optional hooks used by record/replay runs (see replay.py): rewrite
+        # maps a URL to the one actually requested, recorder.save keeps bodies
+        self.rewrite = None
+        self.recorder = None
+
+    def get(self, url, headers=None, timeout=15):
+        """GET url and return a FetchResult; raises on HTTP errors other than 304"""
+        metrics = FetchMetrics(url=url)
+        started = time.monotonic()
+        response = self.session.get(self._target(url), headers=headers, timeout=timeout, stream=True)
+        try:
+            metrics.ttfb = time.monotonic() - started
+            metrics.status = response.status_code
+            if response.status_code != 304:
+                response.raise_for_status()
+
+            chunks = []
+            size = 0
+            for chunk in response.raw.stream(CHUNK_SIZE, decode_content=True):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_body_bytes:
+                    metrics.truncated = True
+                    break
+            body = b''.join(chunks)[:self.max_body_bytes]
+            metrics.wire_bytes = response.raw.tell()
+            metrics.decoded_bytes = len(body)
+        finally:
+            response.close()
+            metrics.total_time = time.monotonic() - started
+            with self._lock:
+                self.history.append(metrics)
+            TRACER.count(requests=1, bytes_fetched=metrics.wire_bytes)
+
+        if self.recorder is not None and response.status_code != 304:
+            self.recorder.save(url, response.status_code, response.headers, body)
+        encoding = detect_encoding(response.headers.get('Content-Type'), body)
+        return FetchResult(response.status_code, response.headers, body, encoding, metrics)
+
+    def stream(self, url, headers=None, timeout=15):
+        """GET url and yield decoded body chunks as they arrive
+
+        Closing the generator early closes the connection, so callers that only
+        need the beginning of a document do not download the rest of it.
+        """
+        metrics = FetchMetrics(url=url)
+        started = time.monotonic()
+        response = self.session.get(self._target(url), headers=headers, timeout=timeout, stream=True)
+        # A recording keeps what the caller read, which is all a replay needs
+        received = [] if self.recorder is not None else None
+        try:
+            metrics.ttfb = time.monotonic() - started
+            metrics.status = response.status_code
+            response.raise_for_status()
+            for chunk in response.raw.stream(CHUNK_SIZE, decode_content=True):
+                metrics.decoded_bytes += len(chunk)
+                if metrics.decoded_bytes > self.max_body_bytes:
+                    metrics.truncated = True
+                    break
+                if received is not None:
+                    received.append(chunk)
+                yield chunk
+        finally:
+            if received is not None and response.ok:
+                self.recorder.save(url, response.status_code, response.headers, b''.join(received))
+            metrics.wire_bytes = response.raw.tell()
+            response.close()
+            metrics.total_time = time.monotonic() - started
+            with self._lock:
+                self.history.append(metrics)
+            TRACER.count(requests=1, bytes_fetched=metrics.wire_bytes)
+
+    def _target(self, url):
+        return self.rewrite(url) if self.rewrite is not None else url
+
+    def summary(self):
+        """Aggregate metrics over every request made so far"""
+        with self._lock:
+            history = list(self.history)
+        return {
+            'requests': len(history),
+            'wire_bytes': sum(m.wire_bytes for m in history),
+            'decoded_bytes': sum(m.decoded_bytes for m in history),
+            'total_time': sum(m.total_time for m in history),
+        }
+
+TRANSPORT = Transport()